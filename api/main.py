@@ -1,14 +1,45 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+import asyncio
+import json
+import logging
+import time
 from pydantic import BaseModel
 from typing import List
 from src.llm.rag_pipeline import RAGPipeline
+from src.config import LOG_LEVEL
+from src import registry
+from src.metrics import STARTUP_SECONDS
 
-rag = RAGPipeline()
+# Chunk previews in the query path are logged at DEBUG only
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+logger = logging.getLogger(__name__)
+
+# Built and warmed up on startup, not at import, so importing the app stays cheap
+rag = None
+
+@asynccontextmanager
+async def lifespan(app):
+    global rag
+    start = time.perf_counter()
+    rag = await asyncio.to_thread(RAGPipeline)
+    warmup = await asyncio.to_thread(rag.warmup)
+    elapsed = time.perf_counter() - start
+    STARTUP_SECONDS.set(elapsed)
+    logger.info("RAG pipeline ready in %.2fs (warmup %s, loads %s)", elapsed, warmup, registry.load_times())
+    yield
+    # Stop the cache's version poller, then release the shared Qdrant connection pool
+    rag.close()
+    registry.close()
 
 app = FastAPI(
     title="IMF RAG API",
     description="Query the IMF RAG pipeline",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
 class QueryRequest(BaseModel):
@@ -19,13 +50,49 @@ class QueryResponse(BaseModel):
     sources: List[str]
     context: List[str]
 
+def sources_and_context(docs):
+    sources = list(dict.fromkeys(doc.metadata.get("source", "unknown") for doc in docs))
+    context = [doc.page_content for doc in docs]
+    return sources, context
+
 @app.post("/query", response_model=QueryResponse)
-def query_rag(request: QueryRequest):
-    answer = rag.query(request.query)
-    
-    # Retrieve context docs
-    context_docs = rag.hybrid_retriever.qdrant_store.similarity_search(request.query, k=3)
-    sources = list({doc.metadata.get("source", "unknown") for doc in context_docs})
-    context = [doc.page_content for doc in context_docs]
+async def query_rag(request: QueryRequest):
+    # aquery returns the reranked documents it used, so no second retrieval is needed
+    result = await rag.aquery(request.query)
+    sources, context = sources_and_context(result["documents"])
     
-    return QueryResponse(answer=answer, sources=sources, context=context)
+    return QueryResponse(answer=result["answer"], sources=sources, context=context)
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters and sizes of the answer, retrieval and semantic caches."""
+    return rag.cache.stats()
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus exposition: per-stage latency histograms, candidate counts, cache and rerank counters."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/query/stream")
+async def query_rag_stream(request: QueryRequest):
+    """Server-Sent Events: one ``sources`` event, then ``token`` events, then ``done``."""
+    async def events():
+        try:
+            async for kind, payload in rag.astream(request.query):
+                if kind == "documents":
+                    sources, context = sources_and_context(payload)
+                    yield sse("sources", {"sources": sources, "context": context})
+                else:
+                    yield sse("token", {"text": payload})
+            yield sse("done", {})
+        except Exception as e:
+            yield sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
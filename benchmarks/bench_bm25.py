@@ -0,0 +1,72 @@
+"""Compare the built-in BM25Index against rank_bm25.BM25Okapi.
+
+Run from the repo root:
+    python -m benchmarks.bench_bm25 --docs 20000 --queries 200
+"""
+import argparse
+import time
+import numpy as np
+from rank_bm25 import BM25Okapi
+from src.retrieval.bm25_index import BM25Index
+
+
+def synthetic_corpus(num_docs, vocab_size, doc_len, seed=0):
+    # Zipf-distributed vocabulary, roughly what real text looks like
+    rng = np.random.default_rng(seed)
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    docs = []
+    for _ in range(num_docs):
+        ids = np.minimum(rng.zipf(1.2, size=doc_len), vocab_size) - 1
+        docs.append([vocab[i] for i in ids])
+    return docs, vocab
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return results, (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25Index vs rank_bm25 benchmark")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--doc-len", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=15)
+    args = parser.parse_args()
+
+    corpus, vocab = synthetic_corpus(args.docs, args.vocab, args.doc_len)
+    rng = np.random.default_rng(1)
+    queries = [[vocab[i] for i in rng.integers(0, 2000, size=4)] for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    okapi = BM25Okapi(corpus)
+    okapi_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = BM25Index.build(corpus)
+    index_build = time.perf_counter() - start
+
+    def okapi_search(q):
+        scores = okapi.get_scores(q)
+        return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:args.k]
+
+    def index_search(q):
+        return index.top_k(q, k=args.k)[0].tolist()
+
+    okapi_hits, okapi_latency = timed(okapi_search, queries)
+    index_hits, index_latency = timed(index_search, queries)
+
+    overlap = np.mean([
+        len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(okapi_hits, index_hits)
+    ])
+
+    print(f"📊 BM25 benchmark: {args.docs} docs, {args.queries} queries, k={args.k}")
+    print(f"  rank_bm25  build {okapi_build:.2f}s | query {okapi_latency * 1000:.2f} ms")
+    print(f"  BM25Index  build {index_build:.2f}s | query {index_latency * 1000:.2f} ms")
+    print(f"  Speedup x{okapi_latency / index_latency:.1f} | top-k agreement {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Chunks per second for the chunking engine, per sentence segmenter.
+
+Run from the repo root:
+    python -m benchmarks.bench_chunking --records 2000
+    python -m benchmarks.bench_chunking --records 200 --spacy-model en_core_web_trf --processes 4
+"""
+import argparse
+import time
+from benchmarks.synthetic import synthetic_records
+from src.graph.chunking import Chunker, RuleSentenceSegmenter, SpacySentenceSegmenter
+
+
+def run(name, chunker, records):
+    start = time.perf_counter()
+    chunks = sum(1 for _ in chunker.iter_chunks(records))
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<24} {chunks} chunks in {elapsed:.2f}s | {chunks / elapsed:,.0f} chunks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunking throughput benchmark")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--sentences", type=int, default=60, help="Sentences per record")
+    parser.add_argument("--spacy-model", type=str, default=None, help="Also benchmark this spaCy segmenter")
+    parser.add_argument("--processes", type=int, default=1, help="nlp.pipe processes for the spaCy segmenter")
+    args = parser.parse_args()
+
+    records = synthetic_records(args.records, sentences_per_record=args.sentences)
+    print(f"📊 Chunking benchmark: {args.records} records x {args.sentences} sentences")
+
+    run("rule", Chunker(RuleSentenceSegmenter()), records)
+    if args.spacy_model:
+        segmenter = SpacySentenceSegmenter(args.spacy_model, n_process=args.processes)
+        run(f"{args.spacy_model} (x{args.processes})", Chunker(segmenter), records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""End-to-end build and query benchmark on an in-memory Qdrant with a stub LLM.
+
+For each corpus size the node functions of the non-streaming build graph
+(``run_graph.py --build``) run in order on synthetic IMF-like records written
+to a JSONL file: load + chunk (the graph streams records straight into the
+chunker, so they are timed together), dedup, embed and upload (including the
+ANN recall gate when ``--eval-queries`` is set). Then ``RAGPipeline.query``
+runs against the result with the query cache cleared before every question.
+Reports throughput, peak RSS per build stage and p50/p95/p99 per query stage
+(from the same stage timers that feed /metrics), and writes JSON tagged with
+the git commit so runs can be compared.
+
+The encoder is passed in (stub or real) instead of loaded by ``get_encoder``,
+the embedding cache is not used, and the upload recreates the collection in
+an in-memory Qdrant. Chunks beyond the requested size (e.g. from a whole
+``--records`` file) are cut after chunking.
+
+Run from the repo root:
+    python -m benchmarks.bench_e2e --sizes 1000 10000 100000 --queries 200
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+import numpy as np
+from qdrant_client import QdrantClient
+from benchmarks.measure import measure_stage, percentiles, write_results
+from benchmarks.stubs import AsyncStubLLM, HashingEncoder, OverlapCrossEncoder, StubLLM
+from benchmarks.synthetic import synthetic_records
+from src.config import ANN_EVAL_QUERIES, CHUNK_SEGMENTER, DEDUP_THRESHOLD
+from src.embeddings import SentenceTransformerEmbeddings
+from src.graph.nodes import chunk_documents, dedup_documents, embed_documents, load_clean_data, upload_to_qdrant
+from src.llm.rag_pipeline import RAGPipeline
+from src.metrics import add_observer, remove_observer
+from src.retrieval.reranker import Reranker
+from src.storage import JsonlWriter
+
+COLLECTION = "bench_rag"
+# ~60 sentences per synthetic record pack into 3-4 chunks
+CHUNKS_PER_RECORD = 3
+
+
+def load_models(kind):
+    """(encoder for the build, LangChain embeddings for queries, reranker)."""
+    if kind == "real":
+        from src.embeddings.encoders import SentenceTransformerEncoder
+        encoder = SentenceTransformerEncoder()
+        return encoder, SentenceTransformerEmbeddings(model=encoder.model), Reranker(batching=False)
+    encoder = HashingEncoder()
+    return encoder, SentenceTransformerEmbeddings(model=encoder), Reranker(batching=False, model=OverlapCrossEncoder())
+
+
+def run_size(size, args, models):
+    encoder, embeddings, reranker = models
+    results = {}
+    print(f"📊 {size:,} chunks")
+
+    index_dir = tempfile.mkdtemp(prefix="bench_e2e_")
+    records_path = args.records
+    if records_path is None:
+        records_path = os.path.join(index_dir, "records.jsonl")
+        with JsonlWriter(records_path, index=False) as out:
+            for record in synthetic_records(size // CHUNKS_PER_RECORD + 1, sentences_per_record=60, seed=args.seed):
+                out.write(record)
+
+    client = QdrantClient(":memory:")
+    pipeline = None
+    try:
+        chunk_count = [0]
+        with measure_stage(results, "load_chunk", chunk_count):
+            docs = chunk_documents(load_clean_data(records_path), segmenter=args.segmenter)[:size]
+            chunk_count[0] = len(docs)
+
+        with measure_stage(results, "dedup", len(docs)):
+            docs = dedup_documents(docs, args.dedup_threshold)
+        results["dedup"]["unique"] = len(docs)
+
+        with measure_stage(results, "embed", len(docs)):
+            vectors, model = embed_documents(docs, batch_size=args.batch_size, encoder=encoder)
+
+        with measure_stage(results, "upload", len(docs)):
+            upload_to_qdrant(vectors, docs, model, collection_name=COLLECTION, mode="recreate",
+                             eval_queries=args.eval_queries, client=client, index_dir=index_dir, workers=1)
+
+        pipeline = RAGPipeline(
+            retrieval_mode=args.retrieval_mode,
+            client=client,
+            embeddings=embeddings,
+            reranker=reranker,
+            llm=StubLLM(tokens=args.llm_tokens, latency=args.llm_latency),
+            async_llm=AsyncStubLLM(tokens=args.llm_tokens, latency=args.llm_latency),
+            collection_name=COLLECTION,
+            index_dir=index_dir
+        )
+
+        # Questions built from chunk openings, so both legs have something to find
+        rng = np.random.default_rng(args.seed)
+        queries = [" ".join(docs[int(i)].page_content.split()[:8]) for i in rng.integers(len(docs), size=args.queries)]
+
+        # First query memory-maps the BM25 snapshot
+        with measure_stage(results, "query_warmup", 1):
+            pipeline.query(queries[0])
+
+        samples = defaultdict(list)
+        observer = lambda name, seconds: samples[name].append(seconds)
+        add_observer(observer)
+        try:
+            with measure_stage(results, "query", len(queries)):
+                for q in queries:
+                    pipeline.cache.clear()
+                    pipeline.query(q)
+        finally:
+            remove_observer(observer)
+
+        results["query_stages"] = {name: {"count": len(v), **percentiles(v)} for name, v in sorted(samples.items())}
+        for name, stats in results["query_stages"].items():
+            print(f"    {name:<16} p50 {stats['p50']:>9} ms  p95 {stats['p95']:>9} ms  p99 {stats['p99']:>9} ms")
+    finally:
+        if pipeline is not None:
+            pipeline.close()
+        client.close()
+        shutil.rmtree(index_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end build + query benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Corpus sizes in chunks")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--records", default=None, help="Use cleaned records (JSONL) instead of synthetic ones")
+    parser.add_argument("--models", choices=["stub", "real"], default="stub",
+                        help="stub: hashing encoder + overlap scorer; real: MiniLM + cross-encoder")
+    parser.add_argument("--retrieval-mode", choices=["client", "native"], default="client")
+    parser.add_argument("--segmenter", default=CHUNK_SEGMENTER)
+    parser.add_argument("--dedup-threshold", type=float, default=DEDUP_THRESHOLD, help="0 disables dedup, as --no-dedup")
+    parser.add_argument("--eval-queries", type=int, default=ANN_EVAL_QUERIES,
+                        help="Sampled queries for the ANN recall gate in the upload stage (0 = off)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--llm-tokens", type=int, default=64)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds the stub LLM sleeps per call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="benchmarks/results")
+    args = parser.parse_args()
+
+    models = load_models(args.models)
+    results = {"config": vars(args), "sizes": {}}
+    for size in args.sizes:
+        results["sizes"][str(size)] = run_size(size, args, models)
+    write_results(results, args.output_dir, "e2e")
+
+
+if __name__ == "__main__":
+    main()
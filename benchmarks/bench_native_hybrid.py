@@ -0,0 +1,78 @@
+"""Native (server-side) hybrid search against an in-memory Qdrant, vs. client-side BM25 fusion.
+
+Random unit vectors stand in for embeddings, so this measures retrieval cost
+and memory shape, not relevance. Run from the repo root:
+    python -m benchmarks.bench_native_hybrid --chunks 5000 --queries 200
+"""
+import argparse
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from benchmarks.synthetic import synthetic_records
+from src.retrieval.bm25_index import BM25Index, tokenize
+from src.retrieval.native_hybrid import NativeHybridRetriever
+from src.retrieval.sparse_encoder import sparse_doc_vector
+from src.vectorstore.collection_sync import ParallelUploader, create_collection, stable_point_id
+
+COLLECTION = "bench_native_hybrid"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Native Qdrant hybrid search benchmark")
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=15)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    records = synthetic_records(args.chunks, sentences_per_record=8)
+    texts = [r["content"] for r in records]
+    vectors = rng.normal(size=(len(texts), args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    client = QdrantClient(":memory:")
+    ids = [stable_point_id(r["source"], r["content"]) for r in records]
+    payloads = [{"page_content": r["content"], "source": r["source"]} for r in records]
+    sparse = [sparse_doc_vector(t) for t in texts]
+
+    def upload(collection, with_sparse):
+        create_collection(client, collection, args.dim, recreate=True)
+        start = time.perf_counter()
+        uploader = ParallelUploader(client, collection, workers=1)
+        for i in range(0, len(texts), 256):
+            batch = slice(i, i + 256)
+            uploader.submit(ids[batch], vectors[batch], payloads[batch], sparse[batch] if with_sparse else None)
+        uploader.close()
+        return time.perf_counter() - start
+
+    # Dense-only first: shows what converting batches to per-point named vectors costs
+    dense_only = upload(f"{COLLECTION}_dense", with_sparse=False)
+    client.delete_collection(f"{COLLECTION}_dense")
+    with_sparse = upload(COLLECTION, with_sparse=True)
+    print(f"📦 Indexed {len(texts)} chunks: dense only {dense_only:.2f}s, dense + sparse {with_sparse:.2f}s "
+          f"(sparse vectors precomputed)")
+
+    queries = [" ".join(texts[int(i)].split()[:6]) for i in rng.integers(len(texts), size=args.queries)]
+    query_vectors = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+
+    retriever = NativeHybridRetriever(client, COLLECTION, embeddings=None)
+    start = time.perf_counter()
+    for q, v in zip(queries, query_vectors):
+        retriever.search_with_scores(q, k=args.k, query_vector=v)
+    native = (time.perf_counter() - start) / args.queries
+
+    bm25 = BM25Index.build(tokenize(t) for t in texts)
+    start = time.perf_counter()
+    for q, v in zip(queries, query_vectors):
+        client.query_points(collection_name=COLLECTION, query=v.tolist(), limit=args.k)
+        bm25.top_k(tokenize(q), k=args.k)
+    client_side = (time.perf_counter() - start) / args.queries
+
+    print(f"  native  {native * 1000:.2f} ms/query (one fused Qdrant query)")
+    print(f"  client  {client_side * 1000:.2f} ms/query (dense query + in-process BM25, "
+          f"{sum(getattr(bm25, name).nbytes for name in BM25Index.ARRAYS) / 2**20:.1f} MiB index per worker)")
+
+
+if __name__ == "__main__":
+    main()
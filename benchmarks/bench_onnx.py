@@ -0,0 +1,55 @@
+"""PyTorch vs int8 ONNX latency and agreement for the embedding model and cross-encoder.
+
+Run from the repo root:
+    python -m benchmarks.bench_onnx --texts 512 --batch-size 32
+"""
+import argparse
+import time
+from benchmarks.synthetic import synthetic_records
+from src.embeddings.onnx_backend import (
+    load_sentence_transformer, load_cross_encoder, embedding_agreement, score_agreement
+)
+
+EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="int8 ONNX inference benchmark")
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=8)
+    args = parser.parse_args()
+
+    texts = [r["content"][:1200] for r in synthetic_records(args.texts, sentences_per_record=8)]
+    queries = [f"inflation outlook question {i}" for i in range(args.queries)]
+    pairs = [(q, t) for q in queries for t in texts[:15]]
+
+    print(f"📊 Embeddings: {len(texts)} texts, batch size {args.batch_size}")
+    torch_st = load_sentence_transformer(EMBED_MODEL, backend="torch")
+    onnx_st = load_sentence_transformer(EMBED_MODEL, backend="onnx-int8")
+    for name, model in (("torch", torch_st), ("onnx-int8", onnx_st)):
+        elapsed = timed(lambda: model.encode(texts, batch_size=args.batch_size))
+        print(f"  {name:<10} {len(texts) / elapsed:,.1f} texts/s ({elapsed:.2f}s)")
+    print(f"  agreement  {embedding_agreement(torch_st, onnx_st, texts[:128])}")
+
+    print(f"📊 Cross-encoder: {len(pairs)} pairs")
+    torch_ce = load_cross_encoder(RERANK_MODEL, backend="torch")
+    onnx_ce = load_cross_encoder(RERANK_MODEL, backend="onnx-int8")
+    for name, model in (("torch", torch_ce), ("onnx-int8", onnx_ce)):
+        elapsed = timed(lambda: model.predict(pairs, batch_size=args.batch_size))
+        print(f"  {name:<10} {len(pairs) / elapsed:,.1f} pairs/s ({elapsed:.2f}s)")
+    print(f"  agreement  {score_agreement(torch_ce, onnx_ce, pairs, top_k=5)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Recall vs. latency and estimated RAM for each collection profile.
+
+Clustered random unit vectors stand in for embeddings. Each profile gets its
+own collection; recall@k is measured against exact brute-force top-k and
+latency per query is reported as p50/p95/p99. Needs a Qdrant server:
+``QdrantClient(":memory:")`` ignores HNSW and quantization settings. Collections
+below Qdrant's indexing threshold (~20k vectors at 384 dims) are searched
+without HNSW, so use a large enough ``--chunks``.
+
+Run from the repo root:
+    python -m benchmarks.bench_profiles --chunks 100000 --queries 200 --ef 64 128 256
+"""
+import argparse
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from benchmarks.measure import percentiles, write_results
+from src.config import QDRANT_URL
+from src.vectorstore.ann_eval import ann_top_k, exact_top_k, normalize, recall_at_k, wait_for_index
+from src.vectorstore.collection_sync import ParallelUploader, create_collection, stable_point_id
+from src.vectorstore.profiles import PROFILES, get_profile
+
+COLLECTION = "bench_profile"
+PAYLOAD_BYTES = 1200
+
+
+def clustered_vectors(n, dim, clusters=256, spread=0.35, seed=0):
+    """Unit vectors around ``clusters`` centres, closer to real embedding neighbourhoods than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centres = normalize(rng.normal(size=(clusters, dim)))
+    vectors = centres[rng.integers(clusters, size=n)] + spread * rng.normal(size=(n, dim)) / np.sqrt(dim)
+    return normalize(vectors)
+
+
+def estimated_ram_mb(profile, n, dim):
+    """Rough resident size: RAM-held vectors, quantized copies, HNSW links and payloads."""
+    ram = 0 if profile.on_disk_vectors else n * dim * 4
+    if profile.quantization == "int8":
+        ram += n * dim
+    elif profile.quantization == "binary":
+        ram += n * dim / 8
+    ram += n * profile.m * 2 * 4
+    if not profile.on_disk_payload:
+        ram += n * PAYLOAD_BYTES
+    return round(ram / 2**20, 1)
+
+
+def run_profile(client, name, vectors, ids, queries, exact, args):
+    profile = get_profile(name)
+    collection = f"{COLLECTION}_{name}"
+    print(f"📊 {profile.describe()}")
+    create_collection(client, collection, vectors.shape[1], recreate=True, profile=profile)
+
+    start = time.perf_counter()
+    uploader = ParallelUploader(client, collection, workers=4)
+    payload = {"page_content": "x" * PAYLOAD_BYTES, "source": "bench"}
+    for i in range(0, len(vectors), 1024):
+        batch_ids = ids[i:i + 1024]
+        uploader.submit(batch_ids, vectors[i:i + 1024], [payload] * len(batch_ids))
+    uploader.close()
+    indexed = wait_for_index(client, collection)
+    build_seconds = time.perf_counter() - start
+
+    results = {
+        "build_seconds": round(build_seconds, 2),
+        "indexed_vectors": indexed,
+        "estimated_ram_mb": estimated_ram_mb(profile, len(vectors), vectors.shape[1]),
+        "search": {},
+    }
+    for ef in args.ef or [None]:
+        params = profile.search_params(ef)
+        ann_top_k(client, collection, queries[:10], args.k, params)  # warm caches
+        ann, latencies = ann_top_k(client, collection, queries, args.k, params)
+        recall = recall_at_k(exact, ann, args.k)
+        label = f"ef={ef or profile.hnsw_ef or 'default'}"
+        results["search"][label] = {"recall": round(recall, 4), **percentiles(latencies)}
+        p = results["search"][label]
+        print(f"  {label:<12} recall@{args.k} {recall:.3f}  p50 {p['p50']} ms  p95 {p['p95']} ms")
+    print(f"  build {build_seconds:.1f}s, {indexed} indexed, ~{results['estimated_ram_mb']} MiB RAM")
+
+    if not args.keep:
+        client.delete_collection(collection)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collection profile recall/latency benchmark")
+    parser.add_argument("--url", default=QDRANT_URL)
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=15)
+    parser.add_argument("--ef", type=int, nargs="*", help="Search-time hnsw_ef values to sweep (default: the profile's)")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections")
+    parser.add_argument("--output-dir", default="benchmarks/results")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url)
+    vectors = clustered_vectors(args.chunks + args.queries, args.dim)
+    vectors, queries = vectors[:args.chunks], vectors[args.chunks:]
+    ids = [stable_point_id("bench", str(i)) for i in range(len(vectors))]
+
+    start = time.perf_counter()
+    exact = [[ids[i] for i in row] for row in exact_top_k(vectors, queries, args.k)]
+    print(f"🎯 Exact top-{args.k} for {args.queries} queries over {args.chunks:,} vectors in {time.perf_counter() - start:.2f}s")
+
+    results = {"chunks": args.chunks, "queries": args.queries, "dim": args.dim, "k": args.k, "profiles": {}}
+    for name in args.profiles:
+        results["profiles"][name] = run_profile(client, name, vectors, ids, queries, exact, args)
+    write_results(results, args.output_dir, "profiles")
+
+
+if __name__ == "__main__":
+    main()
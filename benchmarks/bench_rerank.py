@@ -0,0 +1,45 @@
+"""Reranks per second under concurrent load, with and without request coalescing.
+
+Run from the repo root:
+    python -m benchmarks.bench_rerank --clients 16 --requests 400
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from langchain.schema import Document
+from benchmarks.synthetic import synthetic_records
+from src.retrieval.reranker import Reranker
+
+
+def run(name, reranker, requests, clients):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(lambda r: reranker.rerank(r[0], r[1], top_k=5), requests))
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<10} {len(requests) / elapsed:,.1f} reranks/s ({elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-encoder micro-batching benchmark")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent callers")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--candidates", type=int, default=15, help="(query, doc) pairs per request")
+    parser.add_argument("--max-batch", type=int, default=128)
+    parser.add_argument("--max-wait-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    records = synthetic_records(args.candidates * 4, sentences_per_record=8)
+    docs = [Document(page_content=r["content"], metadata={"source": r["source"]}) for r in records]
+    requests = [
+        (f"inflation outlook question {i}", docs[(i % 4) * args.candidates:(i % 4 + 1) * args.candidates])
+        for i in range(args.requests)
+    ]
+
+    print(f"📊 Rerank benchmark: {args.requests} requests x {args.candidates} pairs, {args.clients} clients")
+    run("direct", Reranker(batching=False), requests, args.clients)
+    run("batched", Reranker(batching=True, max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms),
+        requests, args.clients)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Timing, percentile, peak-RSS and result-file helpers shared by the benchmarks."""
+import json
+import os
+import platform
+import subprocess
+import time
+from contextlib import contextmanager
+import numpy as np
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """``{"p50": ..., "p95": ..., "p99": ...}`` in milliseconds."""
+    if not samples:
+        return {f"p{p}": None for p in points}
+    values = np.percentile(np.asarray(samples) * 1000, points)
+    return {f"p{p}": round(float(v), 3) for p, v in zip(points, values)}
+
+
+def _status_kb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Reset VmHWM so the next ``peak_rss_mb`` covers only what runs after it (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    hwm = _status_kb("VmHWM")
+    if hwm is None:
+        import resource
+        # Since process start; ru_maxrss is KiB on Linux, bytes on macOS
+        hwm = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if platform.system() == "Darwin":
+            hwm //= 1024
+    return round(hwm / 1024, 1)
+
+
+@contextmanager
+def measure_stage(results, name, items=None):
+    """Record wall time, throughput (``items`` per second) and peak RSS of the enclosed block.
+
+    ``items`` may be a number or a one-element list filled in by the block.
+    """
+    reset_peak_rss()
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    count = items[0] if isinstance(items, list) else items
+    results[name] = {
+        "seconds": round(elapsed, 3),
+        "items": count,
+        "items_per_s": round(count / elapsed, 1) if count and elapsed > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    rate = f", {results[name]['items_per_s']:,} /s" if results[name]["items_per_s"] else ""
+    print(f"  {name:<18} {elapsed:8.2f}s{rate}, peak RSS {results[name]['peak_rss_mb']} MiB")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(results, output_dir, name):
+    """Write ``results`` with the commit, host and timestamp to ``<output_dir>/<name>-<time>-<commit>.json``."""
+    commit = git_commit()
+    payload = {
+        "benchmark": name,
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        **results,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{name}-{time.strftime('%Y%m%d%H%M%S')}-{commit}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"💾 Results written to {path}")
+    return path
@@ -0,0 +1,78 @@
+"""Local stand-ins for the models and Ollama, so benchmarks measure the pipeline around them.
+
+``HashingEncoder`` and ``OverlapCrossEncoder`` are deterministic and cheap;
+pass ``--models real`` to a benchmark to use the actual models instead.
+"""
+import asyncio
+import time
+import zlib
+import numpy as np
+from src.retrieval.bm25_index import tokenize
+
+
+class HashingEncoder:
+    """Feature-hashed bag of words projected to ``dim`` unit vectors; SentenceTransformer-like ``encode``."""
+
+    name = "stub/hashing"
+
+    def __init__(self, dim=384, seed=0):
+        self.dim = dim
+        self.seed = seed
+
+    def _vector(self, text):
+        v = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text.lower()):
+            h = zlib.crc32(token.encode("utf-8"), self.seed)
+            v[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return self._vector(texts)
+        return np.stack([self._vector(t) for t in texts]) if texts else np.empty((0, self.dim), dtype=np.float32)
+
+
+class OverlapCrossEncoder:
+    """Scores a (query, doc) pair by query-term overlap; CrossEncoder-like ``predict``."""
+
+    def predict(self, pairs, batch_size=None, **kwargs):
+        scores = np.empty(len(pairs), dtype=np.float32)
+        for i, (query, doc) in enumerate(pairs):
+            q = set(tokenize(query.lower()))
+            d = set(tokenize(doc.lower()))
+            scores[i] = 8.0 * len(q & d) / max(len(q), 1) - 4.0
+        return scores
+
+
+def _reply(messages, tokens):
+    words = [f"token{i}" for i in range(tokens)]
+    return {"message": {"role": "assistant", "content": " ".join(words)}}
+
+
+class StubLLM:
+    """``ollama.Client``-shaped: returns ``tokens`` words after ``latency`` seconds."""
+
+    def __init__(self, tokens=64, latency=0.0):
+        self.tokens = tokens
+        self.latency = latency
+
+    def chat(self, model, messages, stream=False, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return _reply(messages, self.tokens)
+
+
+class AsyncStubLLM(StubLLM):
+    """``ollama.AsyncClient``-shaped, including ``stream=True``."""
+
+    async def chat(self, model, messages, stream=False, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not stream:
+            return _reply(messages, self.tokens)
+
+        async def parts():
+            for i in range(self.tokens):
+                yield {"message": {"role": "assistant", "content": f"token{i} "}}
+        return parts()
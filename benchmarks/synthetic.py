@@ -0,0 +1,38 @@
+"""Synthetic IMF-like records for benchmarks: numbers, regions, trends and section headers."""
+import numpy as np
+
+REGIONS = ["advanced economies", "emerging markets", "sub-Saharan Africa", "the euro area", "China",
+           "the United States", "Latin America", "low-income countries", "the Middle East", "Asia"]
+INDICATORS = ["GDP growth", "headline inflation", "public debt", "the current account balance",
+              "unemployment", "core inflation", "credit growth", "fiscal deficits", "real wages"]
+VERBS = ["is projected to rise to", "is expected to decline to", "moderated to", "remained at",
+         "accelerated to", "is forecast to stabilize at", "fell to"]
+CONNECTIVES = ["Meanwhile,", "In contrast,", "Looking ahead,", "Overall,", "At the same time,", ""]
+HEADERS = ["World Economic Outlook", "Fiscal Monitor", "Global Financial Stability Report", "Annex 2", "Table 1"]
+
+
+def sentence(rng):
+    year = int(rng.integers(2019, 2031))
+    value = rng.normal(3.0, 2.0)
+    connective = CONNECTIVES[rng.integers(len(CONNECTIVES))]
+    body = (f"{INDICATORS[rng.integers(len(INDICATORS))]} in {REGIONS[rng.integers(len(REGIONS))]} "
+            f"{VERBS[rng.integers(len(VERBS))]} {value:.1f} percent in {year}.")
+    return f"{connective} {body}".strip() if connective else body[0].upper() + body[1:]
+
+
+def imf_like_text(rng, num_sentences):
+    parts = []
+    for i in range(num_sentences):
+        if i and rng.random() < 0.03:
+            parts.append(HEADERS[rng.integers(len(HEADERS))])
+        parts.append(sentence(rng))
+    return " ".join(parts)
+
+
+def synthetic_records(num_records, sentences_per_record=60, seed=0):
+    """``{"source", "content"}`` records shaped like collected_data_clean.json entries."""
+    rng = np.random.default_rng(seed)
+    return [
+        {"source": f"https://www.imf.org/en/Publications/synthetic/{i}", "content": imf_like_text(rng, sentences_per_record)}
+        for i in range(num_records)
+    ]
@@ -1,55 +1,37 @@
-import json
-import re
-import langdetect
-from langdetect.lang_detect_exception import LangDetectException
+import argparse
+import time
+from src.cleaning import CleaningStats, iter_clean
+from src.config import COLLECTED_DATA_PATH, CLEAN_DATA_PATH, CLEAN_PROCESSES, LANGID_BACKEND
+from src.config import FOLLOW_GRACE_SECONDS, PIPELINE_RUN_ID
+from src.storage import JsonlWriter, iter_records
 
-INPUT_PATH = "data/output/collected_data.json"
-OUTPUT_PATH = "data/output/collected_data_clean.json"
+INPUT_PATH = COLLECTED_DATA_PATH
+OUTPUT_PATH = CLEAN_DATA_PATH
 
-# Common boilerplate phrases on IMF & similar sites
-BOILERPLATE_PATTERNS = [
-    r"About\s+Us", r"Research", r"Countries", r"News", r"Publications", r"Events",
-    r"Contact\s+Us", r"Legal\s+Information", r"Privacy\s+Policy",
-    r"Subscribe", r"Share", r"Follow\s+Us"
-]
+def clean_json(input_path=INPUT_PATH, output_path=OUTPUT_PATH, follow=False, processes=CLEAN_PROCESSES,
+               langid_backend=LANGID_BACKEND, run_id=PIPELINE_RUN_ID):
+    """Stream ``input_path`` through the cleaning engine into ``output_path`` in constant memory.
 
-def is_english(text):
-    try:
-        lang = langdetect.detect(text[:500])  # Check first 500 chars
-        return lang == "en"
-    except LangDetectException:
-        return False
+    With ``follow`` only this run's input is read (``run_id``, else one whose
+    writer started within ``FOLLOW_GRACE_SECONDS`` before this stage).
+    """
+    stats = CleaningStats()
+    records = iter_records(input_path, follow=follow, run_id=run_id, since=time.time() - FOLLOW_GRACE_SECONDS)
 
-def clean_text(text):
-    # Remove extra whitespace
-    text = re.sub(r"\s+", " ", text)
-    # Remove boilerplate patterns
-    for pattern in BOILERPLATE_PATTERNS:
-        text = re.sub(pattern, "", text, flags=re.IGNORECASE)
-    return text.strip()
+    # Opened before the first input record arrives, so the build's follower sees this run at once
+    with JsonlWriter(output_path, run_id=run_id) as writer:
+        writer.write_many(iter_clean(records, processes=processes, langid_backend=langid_backend, stats=stats))
 
-def clean_json():
-    with open(INPUT_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    cleaned_data = []
-    for entry in data:
-        content = entry.get("content", "")
-        if not content.strip():
-            continue
-
-        content_clean = clean_text(content)
-        if is_english(content_clean):
-            cleaned_data.append({
-                "source": entry.get("source"),
-                "content": content_clean
-            })
-
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(cleaned_data, f, ensure_ascii=False, indent=2)
-
-    print(f"✅ Cleaned JSON saved to {OUTPUT_PATH}")
-    print(f"📝 Original: {len(data)} entries → Cleaned: {len(cleaned_data)} entries")
+    print(f"✅ Cleaned records saved to {output_path}")
+    stats.report()
 
 if __name__ == "__main__":
-    clean_json()
+    parser = argparse.ArgumentParser(description="Clean collected records for RAG")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--follow", action="store_true", help="Clean records while ingest_pipeline.py is still writing them")
+    parser.add_argument("--processes", type=int, default=CLEAN_PROCESSES, help="Cleaning worker processes")
+    parser.add_argument("--langid", choices=["auto", "py3langid", "langdetect"], default=LANGID_BACKEND,
+                        help="Language-ID backend (auto: py3langid if installed, else seeded langdetect)")
+    args = parser.parse_args()
+    clean_json(args.input, args.output, follow=args.follow, processes=args.processes, langid_backend=args.langid)
@@ -1,13 +1,25 @@
 import os
-import json
 import csv
 import argparse
-from src.ingestion import crawl_site, load_pdfs, extract_tables_from_html
+from src.config import COLLECTED_DATA_PATH, PIPELINE_RUN_ID
+from src.ingestion import crawl_site, iter_pdfs, extract_tables_from_html, HttpCache, write_changes
+from src.storage import JsonlWriter
+
+
+def table_record(table):
+    return {"source": table["source"], "content": "\n".join(str(row) for row in table["table"]),
+            "changed": table.get("changed", True)}
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="RAG Ingestion Pipeline")
     parser.add_argument("--start-url", type=str, required=True, help="Starting URL for crawling")
     parser.add_argument("--max-pages", type=int, default=50, help="Maximum number of pages to crawl")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent page fetches")
+    parser.add_argument("--host-delay", type=float, default=0.25, help="Minimum seconds between requests to the same host")
+    parser.add_argument("--pdf-workers", type=int, default=None, help="Processes for PDF extraction (default: CPU count)")
+    parser.add_argument("--pdf-timeout", type=int, default=300, help="Seconds before a single PDF extraction is abandoned")
+    parser.add_argument("--no-http-cache", action="store_true", help="Refetch everything instead of sending conditional requests")
     args = parser.parse_args()
 
     START_URL = args.start_url
@@ -29,52 +41,56 @@ if __name__ == "__main__":
         writer = csv.writer(fail_file)
         writer.writerow(["Failed URL", "Reason"])
 
-    # 1️⃣ Crawl
-    results = crawl_site(START_URL, max_pages=MAX_PAGES)
-    print(f"✅ Crawled {len(results)} pages")
-
-    html_docs = [r for r in results if not r.get("pdf")]
+    # Conditional-GET cache: unchanged pages/PDFs are not re-downloaded or re-extracted
+    http_cache = None if args.no_http_cache else HttpCache()
 
-    # 2️⃣ Extract PDFs (returns text + tables)
-    pdf_docs, pdf_tables = load_pdfs(results)
-    print(f"✅ Extracted {len(pdf_docs)} PDFs")
-    print(f"✅ Extracted {len(pdf_tables)} tables from PDFs")
+    # Records are written one per line as they are produced, so clean_json_for_rag.py --follow
+    # can start before ingestion ends. The output is opened before crawling, so a follower
+    # never picks up the previous run's file and .done marker.
+    # "changed" is False only when the cache confirmed the source is identical to the last run
+    output_path = COLLECTED_DATA_PATH
+    pdf_count = pdf_table_count = 0
 
-    # Log PDFs and PDF tables
-    with open(log_path, "a", newline="", encoding="utf-8") as log_file:
+    with JsonlWriter(output_path, run_id=PIPELINE_RUN_ID) as out, open(log_path, "a", newline="", encoding="utf-8") as log_file:
         writer = csv.writer(log_file)
-        for pdf in pdf_docs:
-            local_path = f"data/pdf_texts/{os.path.basename(pdf['source'])}.txt"
-            writer.writerow([pdf["source"], "PDF Text", local_path, 0])
-        for t in pdf_tables:
-            local_path = f"data/pdf_tables/{os.path.basename(t['source'])}_table.csv"
-            writer.writerow([t["source"], "PDF Table", local_path, len(t["table"])])
-
-    # 3️⃣ Extract tables from HTML
-    html_tables = extract_tables_from_html(html_docs)
-    print(f"✅ Extracted {len(html_tables)} tables from HTML")
-
-    with open(log_path, "a", newline="", encoding="utf-8") as log_file:
-        writer = csv.writer(log_file)
-        for html in html_docs:
-            writer.writerow([html["url"], "HTML Text", "", 0])
-        for t in html_tables:
-            writer.writerow([t["source"], "HTML Table", "", len(t["table"])])
 
-    # 4️⃣ Combine documents
-    all_docs = []
-    all_docs += [{"source": r["url"], "content": r["content"]} for r in html_docs]
-    all_docs += [{"source": p["source"], "content": p["content"]} for p in pdf_docs]
-    all_docs += [{"source": t["source"], "content": "\n".join(str(row) for row in t["table"])} for t in pdf_tables]
-    all_docs += [{"source": t["source"], "content": "\n".join(str(row) for row in t["table"])} for t in html_tables]
+        # 1️⃣ Crawl; 2️⃣ HTML pages and 3️⃣ their tables are written as the crawler finds them,
+        # so page contents are never held for the whole crawl
+        html_table_count = 0
+
+        def write_page(page):
+            global html_table_count
+            if page.get("pdf"):
+                return
+            out.write({"source": page["url"], "content": page["content"], "changed": page.get("changed", True)})
+            writer.writerow([page["url"], "HTML Text", "", 0])
+            for t in extract_tables_from_html([page]):
+                out.write(table_record(t))
+                writer.writerow([t["source"], "HTML Table", "", len(t["table"])])
+                html_table_count += 1
 
-    print(f"📄 Total collected documents: {len(all_docs)}")
+        results = crawl_site(START_URL, max_pages=MAX_PAGES, concurrency=args.concurrency, host_delay=args.host_delay,
+                             http_cache=http_cache, on_record=write_page)
+        print(f"✅ Crawled {results.page_count} pages, found {len(results)} PDFs")
+        print(f"✅ Extracted {html_table_count} tables from HTML")
+        changes = dict(results.changes)
 
-    # 5️⃣ Save combined JSON
-    output_path = "data/output/collected_data.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(all_docs, f, ensure_ascii=False, indent=2)
+        # 4️⃣ Extract PDFs (text + tables), written as each extraction completes
+        for pdf, pdf_tables in iter_pdfs(results, http_cache=http_cache, workers=args.pdf_workers, timeout=args.pdf_timeout):
+            out.write({"source": pdf["source"], "content": pdf["content"], "changed": pdf["changed"]})
+            writer.writerow([pdf["source"], "PDF Text", f"data/pdf_texts/{os.path.basename(pdf['source'])}.txt", 0])
+            for t in pdf_tables:
+                out.write(table_record(t))
+                writer.writerow([t["source"], "PDF Table", f"data/pdf_tables/{os.path.basename(t['source'])}_table.csv", len(t["table"])])
+            changes[pdf["source"]] = pdf["status"]
+            pdf_count += 1
+            pdf_table_count += len(pdf_tables)
 
+    print(f"✅ Extracted {pdf_count} PDFs")
+    print(f"✅ Extracted {pdf_table_count} tables from PDFs")
+    print(f"📄 Total collected documents: {out.count}")
     print(f"💾 Data saved to {output_path}")
+
+    write_changes(changes)
     print(f"📜 Provenance log saved to {log_path}")
     print(f"⚠️ Failed links logged to {fail_log_path}")
@@ -1,15 +1,38 @@
 import argparse
 from src.graph.build_graph import build_pipeline
 from src.llm.rag_pipeline import RAGPipeline
+from src.config import ANN_EVAL_QUERIES, ANN_MIN_RECALL, ANN_EVAL_FAIL
+from src.config import CLEAN_DATA_PATH, COLLECTION_PROFILE, DEDUP_THRESHOLD, EMBED_BATCH_SIZE, QDRANT_SYNC_MODE
+from src.vectorstore.collection_sync import SYNC_MODES
+from src.vectorstore.profiles import PROFILES
 
 parser = argparse.ArgumentParser(description="LangGraph RAG Pipeline")
 parser.add_argument("--build", action="store_true", help="Rebuild Qdrant index from raw data")
 parser.add_argument("--query", type=str, help="Query the RAG pipeline")
+parser.add_argument("--stream", action="store_true", help="Stream chunks through batched embedding and upload (constant memory)")
+parser.add_argument("--no-embed-cache", action="store_true", help="Re-encode every chunk instead of reusing cached embeddings")
+parser.add_argument("--sync-mode", choices=SYNC_MODES, default=QDRANT_SYNC_MODE,
+                    help="recreate the collection, upsert only changes (incremental), or build a shadow collection and swap the alias")
+parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="Chunks per embedding batch")
+parser.add_argument("--data", default=CLEAN_DATA_PATH, help="Cleaned records (JSONL, .jsonl.gz or legacy .json)")
+parser.add_argument("--profile", choices=list(PROFILES), default=COLLECTION_PROFILE,
+                    help="Collection layout (quantization, HNSW, on-disk storage); applied by recreate/shadow builds")
+parser.add_argument("--eval-queries", type=int, default=ANN_EVAL_QUERIES,
+                    help="Sampled queries for the ANN recall check after upload (0 skips it; not run with --stream)")
+parser.add_argument("--min-recall", type=float, default=ANN_MIN_RECALL, help="Warn when ANN recall@k is below this")
+parser.add_argument("--fail-on-low-recall", action="store_true", default=ANN_EVAL_FAIL,
+                    help="Fail the build instead of warning when recall is below --min-recall")
+parser.add_argument("--no-dedup", action="store_true", help="Keep near-duplicate chunks instead of merging them")
+parser.add_argument("--follow", action="store_true", help="Start building while clean_json_for_rag.py is still writing --data")
 args = parser.parse_args()
 
 if args.build:
     print("🚀 Starting LangGraph RAG Build...")
-    graph = build_pipeline(use_openai=False)
+    graph = build_pipeline(use_openai=False, streaming=args.stream, batch_size=args.batch_size, use_cache=not args.no_embed_cache,
+                           sync_mode=args.sync_mode, data_path=args.data, follow=args.follow,
+                           dedup_threshold=0 if args.no_dedup else DEDUP_THRESHOLD, profile=args.profile,
+                           eval_queries=args.eval_queries, min_recall=args.min_recall,
+                           fail_on_low_recall=args.fail_on_low_recall)
     result = graph.invoke({})
     print("🏁 Build finished:", result)
 
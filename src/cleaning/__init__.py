@@ -0,0 +1,3 @@
+from .engine import clean_text, clean_record, iter_clean, get_language_detector, CleaningStats
+
+__all__ = ["clean_text", "clean_record", "iter_clean", "get_language_detector", "CleaningStats"]
@@ -0,0 +1,149 @@
+# src/cleaning/engine.py
+"""Record cleaning for RAG: whitespace + boilerplate removal and an English filter.
+
+Boilerplate phrases are compiled once into a single alternation, language ID
+uses py3langid (deterministic, fast) with seeded langdetect as the fallback,
+and records are cleaned in batches on a process pool while staying in input
+order and streaming.
+"""
+import os
+import re
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Common boilerplate phrases on IMF & similar sites
+BOILERPLATE_PATTERNS = [
+    r"About\s+Us", r"Research", r"Countries", r"News", r"Publications", r"Events",
+    r"Contact\s+Us", r"Legal\s+Information", r"Privacy\s+Policy",
+    r"Subscribe", r"Share", r"Follow\s+Us"
+]
+
+# One pass over the text instead of one re.sub per pattern
+BOILERPLATE_RE = re.compile("|".join(f"(?:{p})" for p in BOILERPLATE_PATTERNS), re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
+
+LANGID_BACKENDS = ("auto", "py3langid", "langdetect")
+# Characters used for language identification
+LANGID_CHARS = 500
+
+# Rejection reasons reported by CleaningStats
+EMPTY = "empty"
+EMPTY_AFTER_CLEAN = "empty_after_clean"
+NOT_ENGLISH = "not_english"
+
+_detector = None
+
+
+def clean_text(text):
+    text = WHITESPACE_RE.sub(" ", text)
+    return BOILERPLATE_RE.sub("", text).strip()
+
+
+def get_language_detector(backend="auto"):
+    """``text -> language code``; the same text always gets the same answer."""
+    if backend not in LANGID_BACKENDS:
+        raise ValueError(f"Unknown language-ID backend '{backend}', expected one of {LANGID_BACKENDS}")
+    if backend in ("auto", "py3langid"):
+        try:
+            import py3langid
+            return lambda text: py3langid.classify(text)[0]
+        except ImportError:
+            if backend == "py3langid":
+                raise
+    import langdetect
+    from langdetect.lang_detect_exception import LangDetectException
+    # langdetect is randomized; a fixed seed makes it deterministic
+    langdetect.DetectorFactory.seed = 0
+
+    def detect(text):
+        try:
+            return langdetect.detect(text)
+        except LangDetectException:
+            return None
+    return detect
+
+
+def _init_worker(backend):
+    global _detector
+    _detector = get_language_detector(backend)
+
+
+def clean_record(entry):
+    """``(cleaned_record, None)`` or ``(None, rejection_reason)``."""
+    content = entry.get("content", "")
+    if not content.strip():
+        return None, EMPTY
+
+    content_clean = clean_text(content)
+    if not content_clean:
+        return None, EMPTY_AFTER_CLEAN
+    if _detector(content_clean[:LANGID_CHARS]) != "en":
+        return None, NOT_ENGLISH
+    return {
+        "source": entry.get("source"),
+        "content": content_clean,
+        "changed": entry.get("changed", True)
+    }, None
+
+
+def _clean_batch(batch):
+    return [clean_record(entry) for entry in batch]
+
+
+class CleaningStats:
+    def __init__(self):
+        self.seen = 0
+        self.kept = 0
+        self.rejected = Counter()
+        self.start = time.perf_counter()
+
+    def add(self, reason):
+        self.seen += 1
+        if reason is None:
+            self.kept += 1
+        else:
+            self.rejected[reason] += 1
+
+    def report(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.seen / elapsed if elapsed > 0 else 0.0
+        print(f"📝 Original: {self.seen} entries → Cleaned: {self.kept} entries ({rate:,.0f} entries/s)")
+        for reason, count in self.rejected.most_common():
+            print(f"   ✂️ {reason}: {count}")
+
+
+def iter_clean(records, processes=None, batch_size=256, langid_backend="auto", stats=None):
+    """Yield cleaned records in input order; ``stats`` (a CleaningStats) is updated as they go.
+
+    With more than one process, batches of ``batch_size`` records are cleaned
+    on a pool with at most ``2 * processes`` batches in flight, so memory stays
+    bounded however long ``records`` is.
+    """
+    stats = stats if stats is not None else CleaningStats()
+    processes = processes or os.cpu_count() or 1
+    records = iter(records)
+    batches = iter(lambda: list(islice(records, batch_size)), [])
+
+    if processes == 1:
+        _init_worker(langid_backend)
+        for batch in batches:
+            yield from _collect(_clean_batch(batch), stats)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(langid_backend,)) as pool:
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(pool.submit(_clean_batch, batch))
+            if len(in_flight) >= 2 * processes:
+                yield from _collect(in_flight.popleft().result(), stats)
+        while in_flight:
+            yield from _collect(in_flight.popleft().result(), stats)
+
+
+def _collect(results, stats):
+    for record, reason in results:
+        stats.add(reason)
+        if record is not None:
+            yield record
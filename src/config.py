@@ -6,5 +6,96 @@ load_dotenv()
 QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
 QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "rag_collection")
 
+# Record files between ingest -> clean -> build (JSONL; a .gz suffix compresses them)
+COLLECTED_DATA_PATH = os.getenv("COLLECTED_DATA_PATH", "data/output/collected_data.jsonl")
+CLEAN_DATA_PATH = os.getenv("CLEAN_DATA_PATH", "data/output/collected_data_clean.jsonl")
+# Shared by the stages of one --follow run: followers only read files stamped with this id.
+# Without it, a follower accepts files whose writer started at most FOLLOW_GRACE_SECONDS before it did
+PIPELINE_RUN_ID = os.getenv("PIPELINE_RUN_ID") or None
+FOLLOW_GRACE_SECONDS = float(os.getenv("FOLLOW_GRACE_SECONDS", "60"))
+
+# Cleaning: worker processes and language-ID backend (auto | py3langid | langdetect)
+CLEAN_PROCESSES = int(os.getenv("CLEAN_PROCESSES", str(os.cpu_count() or 1)))
+LANGID_BACKEND = os.getenv("LANGID_BACKEND", "auto")
+
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-3.5-turbo")  # or local llama
+
+# On-disk lexical index written by the build graph next to the Qdrant vectors
+BM25_INDEX_DIR = os.getenv("BM25_INDEX_DIR", "data/index")
+
+# Chunks per embedding batch in the build graph
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+
+# Persistent embedding cache keyed by (model, chunk hash) for incremental rebuilds
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "data/cache/embeddings.sqlite")
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "1000000"))
+
+# How upload_to_qdrant syncs a build: recreate | incremental | shadow (alias swap)
+QDRANT_SYNC_MODE = os.getenv("QDRANT_SYNC_MODE", "incremental")
+UPSERT_WORKERS = int(os.getenv("UPSERT_WORKERS", "4"))
+
+# Near-duplicate chunk removal (MinHash/LSH) between chunking and embedding; 0 disables it
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+
+# Sentence segmenter for chunking: "rule" (regex, fast) or a spaCy model name such as en_core_web_trf
+CHUNK_SEGMENTER = os.getenv("CHUNK_SEGMENTER", "rule")
+# nlp.pipe worker processes when a spaCy segmenter is used
+CHUNK_PROCESSES = int(os.getenv("CHUNK_PROCESSES", str(min(4, os.cpu_count() or 1))))
+
+# Query cache: exact answers and retrievals, plus an optional semantic tier
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "3600"))
+# Cosine similarity for a semantic hit (e.g. 0.95); empty disables the semantic tier
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD") or 0) or None
+
+# Cross-encoder micro-batching across concurrent requests
+RERANK_BATCHING = os.getenv("RERANK_BATCHING", "1") == "1"
+RERANK_MAX_BATCH = int(os.getenv("RERANK_MAX_BATCH", "128"))
+RERANK_BATCH_WAIT_MS = float(os.getenv("RERANK_BATCH_WAIT_MS", "2"))
+
+# Inference backend for the embedding model and cross-encoder: torch | onnx-int8
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+# Where exported int8 ONNX models are cached
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", "data/models")
+# Quantization config for export_dynamic_quantized_onnx_model: avx2 | avx512 | avx512_vnni | arm64
+ONNX_QUANTIZATION = os.getenv("ONNX_QUANTIZATION", "avx2")
+
+# Reranking: "full" scores every hybrid candidate; "adaptive" cascades them by fused score
+# and stops once the rest can't reach the top_k (final = alpha * fused + (1 - alpha) * sigmoid(ce))
+RERANK_MODE = os.getenv("RERANK_MODE", "full")
+RERANK_ALPHA = float(os.getenv("RERANK_ALPHA", "0.3"))
+# Candidates per cascade round; 0 means top_k
+RERANK_CASCADE_BATCH = int(os.getenv("RERANK_CASCADE_BATCH", "0"))
+
+# Hybrid fusion: weighted (per-leg min-max) | convex (theoretical-min normalization) | rrf
+FUSION_MODE = os.getenv("FUSION_MODE", "weighted")
+# Candidates fetched per leg before fusion; 0 means the requested k
+FUSION_DENSE_K = int(os.getenv("FUSION_DENSE_K", "0"))
+FUSION_BM25_K = int(os.getenv("FUSION_BM25_K", "0"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Retrieval: "client" fuses Qdrant dense hits with the in-process BM25 index;
+# "native" sends one Qdrant query that fuses dense and sparse (bm25) vectors server-side
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "client")
+# Average chunk length in tokens for the sparse vectors' BM25 length normalization
+SPARSE_AVG_DOC_LEN = float(os.getenv("SPARSE_AVG_DOC_LEN", "200"))
+
+# Collection layout: default | int8 | binary | compact (see src/vectorstore/profiles.py).
+# Applied when a collection is created and used for the matching query-side SearchParams
+COLLECTION_PROFILE = os.getenv("COLLECTION_PROFILE", "default")
+# HNSW search beam for dense queries; 0 means the profile's
+SEARCH_HNSW_EF = int(os.getenv("SEARCH_HNSW_EF", "0"))
+
+# Build-time ANN check: sampled chunk vectors as queries, Qdrant top-k vs. exact top-k.
+# 0 queries skips it; below ANN_MIN_RECALL the build warns, or fails with ANN_EVAL_FAIL=1
+ANN_EVAL_QUERIES = int(os.getenv("ANN_EVAL_QUERIES", "100"))
+ANN_EVAL_K = int(os.getenv("ANN_EVAL_K", "10"))
+ANN_MIN_RECALL = float(os.getenv("ANN_MIN_RECALL", "0.9"))
+ANN_EVAL_FAIL = os.getenv("ANN_EVAL_FAIL", "0") == "1"
+
+# Log level for the API; DEBUG logs fusion/rerank scores and the LLM context per request
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -0,0 +1,8 @@
+from .encoders import get_encoder, SentenceTransformerEmbeddings
+from .onnx_backend import load_sentence_transformer, load_cross_encoder
+from .batching import iter_batches, embed_batches, collect_vectors
+from .cache import EmbeddingCache, CachedEncoder
+
+__all__ = [
+    "get_encoder", "SentenceTransformerEmbeddings", "load_sentence_transformer", "load_cross_encoder",
+    "iter_batches", "embed_batches", "collect_vectors", "EmbeddingCache", "CachedEncoder"]
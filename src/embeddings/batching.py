@@ -0,0 +1,54 @@
+# src/embeddings/batching.py
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import numpy as np
+
+
+def iter_batches(items, batch_size):
+    """Yield lists of up to ``batch_size`` items from any iterable, including generators."""
+    it = iter(items)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def embed_batches(docs, encoder, batch_size=64):
+    """Yield ``(batch_docs, vectors)`` with ``vectors`` a float32 array of shape (len(batch_docs), dim).
+
+    Encoding of batch i+1 runs on a background thread while the caller
+    consumes (e.g. uploads) batch i, so only two batches are in memory at once.
+    """
+    batches = iter_batches(docs, batch_size)
+
+    def encode(batch):
+        return encoder.encode([doc.page_content for doc in batch])
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        batch = next(batches, None)
+        pending = pool.submit(encode, batch) if batch else None
+        while pending is not None:
+            vectors = pending.result()
+            current = batch
+            batch = next(batches, None)
+            pending = pool.submit(encode, batch) if batch else None
+            yield current, vectors
+
+
+def collect_vectors(batches, total=None):
+    """Gather streamed batches into one contiguous float32 array (preallocated when ``total`` is known)."""
+    out = None
+    parts = []
+    offset = 0
+    for _, vectors in batches:
+        if total is not None:
+            if out is None:
+                out = np.empty((total, vectors.shape[1]), dtype=np.float32)
+            out[offset:offset + len(vectors)] = vectors
+            offset += len(vectors)
+        else:
+            parts.append(vectors)
+    if total is None:
+        return np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32)
+    return out if out is not None else np.empty((0, 0), dtype=np.float32)
@@ -0,0 +1,136 @@
+# src/embeddings/cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    key TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (model, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+# Stay under SQLite's default bound-parameter limit
+_SQL_BATCH = 500
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent float32 embedding store keyed by (model name, chunk text hash).
+
+    Backed by a single SQLite file. Once it holds more than ``max_entries``
+    vectors, the least recently used ones are evicted down to
+    ``evict_to * max_entries``, so the table is counted once per eviction
+    rather than on every insert.
+    """
+
+    def __init__(self, path, max_entries=1_000_000, evict_to=0.95):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_to = evict_to
+        self._lock = threading.Lock()
+        # The build encodes on a background thread, so the connection is shared under a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # Upper bound on the row count: replaced keys are counted again until the next eviction recounts
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    def get_many(self, model, keys):
+        """Return ``{key: vector}`` for the keys that are cached."""
+        found = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, dim, vector FROM embeddings WHERE model = ? AND key IN ({marks})",
+                    [model, *batch]
+                ).fetchall()
+                for key, dim, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32, count=dim)
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE model = ? AND key = ?",
+                        [(now, model, key) for key, _, _ in rows]
+                    )
+            self._conn.commit()
+        return found
+
+    def put_many(self, model, keys, vectors):
+        now = time.time()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                [(model, key, vec.shape[0], vec.tobytes(), now) for key, vec in zip(keys, vectors)]
+            )
+            self._count += len(keys)
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - int(self.max_entries * self.evict_to) if count > self.max_entries else 0
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE (model, key) IN "
+                "(SELECT model, key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+        self._count = count - excess
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEncoder:
+    """Wraps an encoder so only texts missing from the cache are encoded."""
+
+    def __init__(self, encoder, cache):
+        self.encoder = encoder
+        self.cache = cache
+        self.name = encoder.name
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, texts):
+        texts = list(texts)
+        if not texts:
+            return self.encoder.encode(texts)
+        keys = [text_key(t) for t in texts]
+        cached = self.cache.get_many(self.name, list(set(keys)))
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            fresh = self.encoder.encode([texts[i] for i in missing])
+            self.cache.put_many(self.name, [keys[i] for i in missing], fresh)
+        else:
+            fresh = None
+
+        dim = fresh.shape[1] if fresh is not None else len(next(iter(cached.values())))
+        vectors = np.empty((len(texts), dim), dtype=np.float32)
+        for i, key in enumerate(keys):
+            if key in cached:
+                vectors[i] = cached[key]
+        if missing:
+            vectors[missing] = fresh
+        return vectors
@@ -0,0 +1,95 @@
+# src/embeddings/encoders.py
+import os
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src import registry
+from src.config import EMBED_CACHE_PATH, EMBED_CACHE_MAX_ENTRIES, EMBEDDING_MODEL, INFERENCE_BACKEND
+from src.embeddings.cache import CachedEncoder, EmbeddingCache
+
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def sentence_transformer_name(model_name=EMBEDDING_MODEL, backend=INFERENCE_BACKEND):
+    # Quantized vectors differ slightly, so the backend is part of the name (cache key, collection stamp)
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+class OpenAIEncoder:
+    def __init__(self, model_name=OPENAI_EMBEDDING_MODEL):
+        from langchain_openai import OpenAIEmbeddings
+        self.name = f"openai/{model_name}"
+        self.embeddings = OpenAIEmbeddings(model=model_name)
+
+    def encode(self, texts):
+        # One batched request per call instead of one round-trip per chunk
+        return np.asarray(self.embeddings.embed_documents(list(texts)), dtype=np.float32)
+
+
+class SentenceTransformerEncoder:
+    def __init__(self, model_name=EMBEDDING_MODEL, backend=INFERENCE_BACKEND):
+        self.name = sentence_transformer_name(model_name, backend)
+        self.model = registry.sentence_transformer(model_name, backend)
+
+    def encode(self, texts):
+        vectors = self.model.encode(list(texts), convert_to_numpy=True)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """LangChain embeddings over a SentenceTransformer on the selected inference backend."""
+
+    def __init__(self, model_name=EMBEDDING_MODEL, backend=INFERENCE_BACKEND, model=None):
+        self.model = model if model is not None else registry.sentence_transformer(model_name, backend)
+
+    def embed_documents(self, texts):
+        return self.model.encode(list(texts), convert_to_numpy=True).tolist()
+
+    def embed_query(self, text):
+        return self.model.encode(text, convert_to_numpy=True).tolist()
+
+
+class SpacyEncoder:
+    def __init__(self, model_name="en_core_web_md"):
+        import spacy
+        try:
+            self.nlp = spacy.load(model_name)
+        except OSError:
+            print(f"⚠️ Model '{model_name}' not found. Installing...")
+            os.system(f"python -m spacy download {model_name}")
+            self.nlp = spacy.load(model_name)
+        self.name = f"spacy/{model_name}"
+
+    def encode(self, texts):
+        texts = list(texts)
+        vectors = np.empty((len(texts), self.nlp.vocab.vectors_length), dtype=np.float32)
+        for i, doc in enumerate(self.nlp.pipe(texts)):
+            if doc.vector is None or len(doc.vector) == 0:
+                raise ValueError(f"Empty vector for doc: {texts[i][:50]}...")
+            vectors[i] = doc.vector
+        return vectors
+
+
+def get_encoder(use_openai=True, use_cache=False):
+    """Encoder for the build graph: OpenAI, else SentenceTransformers with a spaCy fallback.
+
+    With ``use_cache`` the encoder is wrapped so unchanged chunks are read from
+    the on-disk embedding cache instead of being re-encoded.
+    """
+    encoder = _load_encoder(use_openai)
+    if use_cache:
+        encoder = CachedEncoder(encoder, EmbeddingCache(EMBED_CACHE_PATH, max_entries=EMBED_CACHE_MAX_ENTRIES))
+    return encoder
+
+
+def _load_encoder(use_openai):
+    if use_openai:
+        print("🧠 Creating embeddings using OpenAI...")
+        return OpenAIEncoder()
+    try:
+        print("🧠 Creating embeddings using SentenceTransformers (all-MiniLM-L6-v2)...")
+        return SentenceTransformerEncoder()
+    except Exception as e:
+        print(f"⚠️ SentenceTransformers failed: {e}")
+        print("⚠️ Falling back to spaCy medium vectors...")
+        return SpacyEncoder()
@@ -0,0 +1,123 @@
+# src/embeddings/onnx_backend.py
+import json
+import os
+import numpy as np
+from src.config import INFERENCE_BACKEND, ONNX_CACHE_DIR, ONNX_QUANTIZATION
+
+BACKENDS = ("torch", "onnx-int8")
+
+# Small fixed probe set used to check a fresh export against the PyTorch model
+PROBE_QUERIES = [
+    "global growth forecast 2025",
+    "inflation in advanced economies",
+    "IMF lending capacity",
+]
+PROBE_DOCS = [
+    "Global growth is projected at 3.2 percent in 2025, broadly unchanged from 2024.",
+    "Headline inflation in advanced economies is expected to decline to 2.0 percent.",
+    "The IMF has about $1 trillion in lending capacity available to its 191 member countries.",
+    "Public debt in emerging markets remained elevated at 70 percent of GDP.",
+]
+
+
+def artifact_dir(model_name):
+    return os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+
+
+def quantized_file_name():
+    return f"onnx/model_qint8_{ONNX_QUANTIZATION}.onnx"
+
+
+def _export(model, model_name, path, measure_agreement):
+    """Save an ONNX copy of ``model``, int8-quantize it and record agreement with PyTorch."""
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    print(f"📦 Exporting {model_name} to int8 ONNX ({ONNX_QUANTIZATION}) in {path}...")
+    model.save_pretrained(path)
+    export_dynamic_quantized_onnx_model(model, ONNX_QUANTIZATION, path)
+
+    agreement = measure_agreement()
+    with open(os.path.join(path, "agreement.json"), "w", encoding="utf-8") as f:
+        json.dump(agreement, f, indent=2)
+    print(f"📏 int8 ONNX vs PyTorch for {model_name}: {agreement}")
+
+
+def load_sentence_transformer(model_name, backend=INFERENCE_BACKEND):
+    """SentenceTransformer on the selected backend; the int8 artifact is exported once and cached on disk."""
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+    path = artifact_dir(model_name)
+    if not os.path.exists(os.path.join(path, quantized_file_name())):
+        onnx_model = SentenceTransformer(model_name, backend="onnx")
+        _export(
+            onnx_model, model_name, path,
+            lambda: embedding_agreement(SentenceTransformer(model_name), _load_st(path), PROBE_QUERIES + PROBE_DOCS)
+        )
+    return _load_st(path)
+
+
+def _load_st(path):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(path, backend="onnx", model_kwargs={"file_name": quantized_file_name()})
+
+
+def load_cross_encoder(model_name, backend=INFERENCE_BACKEND):
+    """CrossEncoder on the selected backend, exported and cached like ``load_sentence_transformer``."""
+    from sentence_transformers import CrossEncoder
+
+    if backend == "torch":
+        return CrossEncoder(model_name)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+    path = artifact_dir(model_name)
+    if not os.path.exists(os.path.join(path, quantized_file_name())):
+        onnx_model = CrossEncoder(model_name, backend="onnx")
+        pairs = [(q, d) for q in PROBE_QUERIES for d in PROBE_DOCS]
+        _export(
+            onnx_model, model_name, path,
+            lambda: score_agreement(CrossEncoder(model_name), _load_ce(path), pairs)
+        )
+    return _load_ce(path)
+
+
+def _load_ce(path):
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(path, backend="onnx", model_kwargs={"file_name": quantized_file_name()})
+
+
+def embedding_agreement(baseline, candidate, texts):
+    """Cosine similarity between the two models' embeddings of the same texts."""
+    a = baseline.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    b = candidate.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    cos = np.sum(a * b, axis=1)
+    return {"mean_cosine": float(cos.mean()), "min_cosine": float(cos.min())}
+
+
+def score_agreement(baseline, candidate, pairs, top_k=3):
+    """Max score difference, Spearman rank correlation and top-k overlap per query."""
+    a = np.asarray(baseline.predict(pairs), dtype=np.float64)
+    b = np.asarray(candidate.predict(pairs), dtype=np.float64)
+    ranks_a = np.argsort(np.argsort(a))
+    ranks_b = np.argsort(np.argsort(b))
+    spearman = float(np.corrcoef(ranks_a, ranks_b)[0, 1]) if len(pairs) > 1 else 1.0
+
+    overlaps = []
+    queries = list(dict.fromkeys(q for q, _ in pairs))
+    for q in queries:
+        idx = np.array([i for i, (pq, _) in enumerate(pairs) if pq == q])
+        k = min(top_k, len(idx))
+        top_a = set(idx[np.argsort(-a[idx])[:k]])
+        top_b = set(idx[np.argsort(-b[idx])[:k]])
+        overlaps.append(len(top_a & top_b) / k)
+
+    return {
+        "max_abs_diff": float(np.max(np.abs(a - b))),
+        "spearman": spearman,
+        f"top{top_k}_overlap": float(np.mean(overlaps)),
+    }
@@ -1,44 +1,73 @@
 from langgraph.graph import StateGraph, START, END
+from src.config import CLEAN_DATA_PATH, COLLECTION_PROFILE, DEDUP_THRESHOLD, EMBED_BATCH_SIZE, QDRANT_SYNC_MODE
+from src.config import ANN_EVAL_QUERIES, ANN_MIN_RECALL, ANN_EVAL_FAIL
 from src.graph.nodes import (
     load_clean_data, 
     chunk_documents, 
+    iter_chunks,
+    dedup_documents,
+    iter_dedup,
     embed_documents, 
-    test_similarity_search, 
+    embed_and_upload,
     upload_to_qdrant
 )
 
-def build_pipeline(use_openai=True):
+def build_pipeline(use_openai=True, streaming=False, batch_size=EMBED_BATCH_SIZE, use_cache=True,
+                   sync_mode=QDRANT_SYNC_MODE, data_path=CLEAN_DATA_PATH, follow=False, dedup_threshold=DEDUP_THRESHOLD,
+                   profile=COLLECTION_PROFILE, eval_queries=ANN_EVAL_QUERIES, min_recall=ANN_MIN_RECALL,
+                   fail_on_low_recall=ANN_EVAL_FAIL):
     print("🛠 Building LangGraph pipeline...")
 
     graph = StateGraph(dict)
 
-    # Nodes
-    graph.add_node("load", lambda state: {"data": load_clean_data()})
+    # Nodes: records are streamed from the JSONL file, never loaded whole
+    graph.add_node("load", lambda state: {"data": load_clean_data(data_path, follow=follow)})
+
+    if streaming:
+        # Chunks flow lazily into batched embedding + upload; nothing is held in full,
+        # so there are no vectors left for the ANN evaluation
+        graph.add_node("chunk", lambda state: {"docs": iter_dedup(iter_chunks(state["data"]), dedup_threshold)})
+        graph.add_node("embed_upload", lambda state: {
+            "result": embed_and_upload(
+                state["docs"], use_openai=use_openai, batch_size=batch_size, use_cache=use_cache, mode=sync_mode,
+                profile=profile
+            )
+        })
+
+        graph.add_edge(START, "load")
+        graph.add_edge("load", "chunk")
+        graph.add_edge("chunk", "embed_upload")
+        graph.add_edge("embed_upload", END)
+
+        print("✅ Pipeline built successfully (streaming)")
+        return graph.compile()
+
     graph.add_node("chunk", lambda state: {"docs": chunk_documents(state["data"])})
+
+    # One canonical chunk per near-duplicate cluster, before paying for embeddings
+    graph.add_node("dedup", lambda state: {"docs": dedup_documents(state["docs"], dedup_threshold)})
     
-    # Keep docs + vectors
-    graph.add_node("embed", lambda state: {
-        "vectors": embed_documents(state["docs"], use_openai=use_openai),
-        "docs": state["docs"]
-    })
+    # Keep docs + vectors, and the name of the encoder that actually ran (a fallback must be stamped as such)
+    def embed(state):
+        vectors, model = embed_documents(state["docs"], use_openai=use_openai, batch_size=batch_size, use_cache=use_cache)
+        return {"vectors": vectors, "model": model, "docs": state["docs"]}
 
-    # Test similarity search before Qdrant
-    graph.add_node("test_search", lambda state: {
-        "vectors": state["vectors"],
-        "docs": state["docs"],
-        "test_results": test_similarity_search(state["docs"], state["vectors"], use_openai=use_openai)
-    })
+    graph.add_node("embed", embed)
 
     graph.add_node("upload", lambda state: {
-        "result": upload_to_qdrant(state["vectors"], state["docs"], use_openai=use_openai)
+        # Recall@k / latency of the new collection vs. exact search over the same vectors is
+        # checked before it is published (alias swap, BM25 snapshot, version stamp)
+        "result": upload_to_qdrant(state["vectors"], state["docs"], state["model"], mode=sync_mode, profile=profile,
+                                   eval_queries=eval_queries, min_recall=min_recall,
+                                   fail_on_low_recall=fail_on_low_recall)
     })
 
     # Flow
     graph.add_edge(START, "load")
     graph.add_edge("load", "chunk")
-    graph.add_edge("chunk", "embed")
-    graph.add_edge("embed", "test_search")
-    graph.add_edge("test_search", "upload")
+    graph.add_edge("chunk", "dedup")
+    graph.add_edge("dedup", "embed")
+    graph.add_edge("embed", "upload")
     graph.add_edge("upload", END)
 
     print("✅ Pipeline built successfully")
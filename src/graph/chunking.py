@@ -0,0 +1,88 @@
+# src/graph/chunking.py
+import re
+from langchain.schema import Document
+
+# IMF report section headers; the capture group keeps them as their own (short, skipped) pieces
+SECTION_PATTERN = re.compile(r"(World Economic Outlook|Fiscal Monitor|Global Financial Stability Report|Annex \d+|Table \d+)")
+
+# Sentence end: terminal punctuation (optionally closed by a quote/bracket), whitespace,
+# then something that can start a sentence. "3.2 percent" and "U.S. economy" don't split.
+SENTENCE_BOUNDARY = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+(?=[A-Z0-9\"'(\[])")
+
+MAX_CHUNK_CHARS = 1200
+MIN_SECTION_CHARS = 50
+
+
+class RuleSentenceSegmenter:
+    """Regex sentence splitter; no model, no per-call setup cost."""
+
+    name = "rule"
+
+    def segment_many(self, texts):
+        for text in texts:
+            yield [s for s in SENTENCE_BOUNDARY.split(text) if s]
+
+
+class SpacySentenceSegmenter:
+    """Sentence boundaries from a spaCy pipeline, batched through ``nlp.pipe``."""
+
+    def __init__(self, model="en_core_web_trf", n_process=1, batch_size=64):
+        import spacy
+        # Only the sentence boundaries are used
+        self.nlp = spacy.load(model, disable=["ner", "lemmatizer"])
+        self.name = model
+        self.n_process = n_process
+        self.batch_size = batch_size
+
+    def segment_many(self, texts):
+        for doc in self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process):
+            yield [sent.text for sent in doc.sents]
+
+
+def get_segmenter(name="rule", n_process=1):
+    """``rule`` for the regex segmenter, otherwise the name of a spaCy model."""
+    if name == "rule":
+        return RuleSentenceSegmenter()
+    return SpacySentenceSegmenter(name, n_process=n_process)
+
+
+class Chunker:
+    """Splits records on IMF section headers, then packs sentences into ~``max_chars`` chunks.
+
+    Sections from many records are segmented together in batches of
+    ``section_batch_size`` so a model segmenter can use ``nlp.pipe``
+    efficiently, while chunks are still yielded as a stream.
+    """
+
+    def __init__(self, segmenter=None, max_chars=MAX_CHUNK_CHARS, min_section_chars=MIN_SECTION_CHARS, section_batch_size=256):
+        self.segmenter = segmenter or RuleSentenceSegmenter()
+        self.max_chars = max_chars
+        self.min_section_chars = min_section_chars
+        self.section_batch_size = section_batch_size
+
+    def iter_chunks(self, data):
+        batch_texts, batch_meta = [], []
+        for d in data:
+            meta = {"source": d["source"]}
+            for sec in SECTION_PATTERN.split(d["content"]):
+                if len(sec.strip()) < self.min_section_chars:
+                    continue
+                batch_texts.append(sec)
+                batch_meta.append(meta)
+                if len(batch_texts) >= self.section_batch_size:
+                    yield from self._chunk_batch(batch_texts, batch_meta)
+                    batch_texts, batch_meta = [], []
+        if batch_texts:
+            yield from self._chunk_batch(batch_texts, batch_meta)
+
+    def _chunk_batch(self, texts, metas):
+        for sentences, meta in zip(self.segmenter.segment_many(texts), metas):
+            chunk, length = [], 0
+            for sent in sentences:
+                chunk.append(sent)
+                length += len(sent)
+                if length > self.max_chars:
+                    yield Document(page_content=" ".join(chunk), metadata=meta)
+                    chunk, length = [], 0
+            if chunk:
+                yield Document(page_content=" ".join(chunk), metadata=meta)
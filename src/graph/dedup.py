@@ -0,0 +1,131 @@
+# src/graph/dedup.py
+import re
+import zlib
+import numpy as np
+
+# Signatures use a universal hash family mod a Mersenne prime; with hashes reduced
+# below 2**31 the products stay inside uint64
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+SHINGLE_BASE = np.uint64(1000003)
+SHINGLE_BLOCK = 4096
+
+WORD_RE = re.compile(r"\w+")
+
+
+def shingle_hashes(text, size=5):
+    """Hashes of the word ``size``-grams of ``text`` (lowercased), as uint64 below the prime."""
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    tokens = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+    if len(tokens) <= size:
+        return np.array([_combine(tokens)], dtype=np.uint64)
+    # Polynomial hash of each window, computed for all windows at once
+    shingles = np.zeros(len(tokens) - size + 1, dtype=np.uint64)
+    for j in range(size):
+        shingles = (shingles * SHINGLE_BASE + tokens[j:len(tokens) - size + 1 + j]) % MERSENNE_PRIME
+    return np.unique(shingles)
+
+
+def _combine(tokens):
+    h = np.uint64(0)
+    for t in tokens:
+        h = (h * SHINGLE_BASE + t) % MERSENNE_PRIME
+    return h
+
+
+class MinHasher:
+    """``num_perm`` MinHash values per text from one seeded set of hash functions."""
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+    def signature(self, text):
+        shingles = shingle_hashes(text, self.shingle_size)
+        signature = np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        # Blocks keep the (shingles x num_perm) matrix small for long texts
+        for start in range(0, len(shingles), SHINGLE_BLOCK):
+            block = shingles[start:start + SHINGLE_BLOCK]
+            hashed = (np.outer(block, self.a) + self.b) % MERSENNE_PRIME
+            np.minimum(signature, hashed.min(axis=0), out=signature)
+        # Values are below 2**31, so uint32 halves what the LSH index keeps per chunk
+        return signature.astype(np.uint32)
+
+
+class MinHashLSH:
+    """Banded LSH over MinHash signatures; the first item of a cluster stays canonical.
+
+    Candidates sharing any band are confirmed with the signature-estimated
+    Jaccard similarity against ``threshold``.
+    """
+
+    def __init__(self, num_perm=128, bands=16, threshold=0.85):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.tables = [dict() for _ in range(bands)]
+        self.signatures = []
+
+    def add_or_match(self, signature):
+        """Index of the canonical item ``signature`` duplicates, or None after adding it as new."""
+        keys = [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+        checked = set()
+        for table, key in zip(self.tables, keys):
+            for candidate in table.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if np.mean(self.signatures[candidate] == signature) >= self.threshold:
+                    return candidate
+
+        index = len(self.signatures)
+        self.signatures.append(signature)
+        for table, key in zip(self.tables, keys):
+            table.setdefault(key, []).append(index)
+        return None
+
+
+class ChunkDeduplicator:
+    """Drops near-duplicate chunks, keeping the first of each cluster with every source merged in."""
+
+    def __init__(self, threshold=0.85, num_perm=128, bands=16, shingle_size=5):
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.index = MinHashLSH(num_perm=num_perm, bands=bands, threshold=threshold)
+        self.canonical = []
+        self.seen = 0
+
+    def iter_unique(self, docs):
+        """Yield canonical chunks as they arrive.
+
+        Sources of later duplicates are appended to the canonical chunk's
+        ``metadata["sources"]``; in a streaming build, ones that arrive after it
+        was uploaded don't reach its payload.
+        """
+        for doc in docs:
+            self.seen += 1
+            match = self.index.add_or_match(self.hasher.signature(doc.page_content))
+            source = doc.metadata.get("source", "")
+            if match is None:
+                # Chunks of one record share a metadata dict; give the canonical its own
+                doc.metadata = {**doc.metadata, "sources": [source]}
+                self.canonical.append(doc.metadata)
+                yield doc
+            else:
+                sources = self.canonical[match]["sources"]
+                if source not in sources:
+                    sources.append(source)
+
+    @property
+    def removed(self):
+        return self.seen - len(self.canonical)
+
+    def report(self):
+        ratio = self.removed / self.seen if self.seen else 0.0
+        print(f"🧹 Dedup: {self.seen} chunks → {len(self.canonical)} canonical "
+              f"({self.removed} near-duplicates removed, {ratio:.1%})")
@@ -1,130 +1,311 @@
-import json
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-import spacy
-from qdrant_client.models import VectorParams, Distance, PointStruct
-from src.vectorstore.qdrant_setup import get_qdrant_client
-from langchain_experimental.text_splitter import SemanticChunker
-from langchain.schema import Document
-import os
-from sentence_transformers import SentenceTransformer
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-import re
-
-def test_similarity_search(docs, vectors, use_openai=True):
-    print("🔍 Testing similarity search locally (FAISS)...")
-
-    if use_openai:
-        embeddings_model = OpenAIEmbeddings(model="text-embedding-3-small")
-    else:
-        embeddings_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-
-    texts = [doc.page_content for doc in docs]
-    faiss_store = FAISS.from_texts(texts, embeddings_model)
-
-    query = "global economic outlook"
-    results = faiss_store.similarity_search(query, k=3)
-
-    for i, r in enumerate(results, start=1):
-        print(f"\nResult {i}:\nSource: {r.metadata.get('source', 'N/A')}\nContent: {r.page_content[:300]}...")
-    return results
-
+from src.vectorstore.qdrant_setup import get_qdrant_client, write_collection_version
+from src.vectorstore.ann_eval import ann_top_k, exact_top_k, recall_at_k, wait_for_index
+from src.vectorstore.profiles import search_params
+from src.retrieval.bm25_snapshot import SnapshotWriter
+from src.retrieval.sparse_encoder import sparse_doc_vector
+from src.embeddings import get_encoder, embed_batches, collect_vectors, CachedEncoder
+from src.vectorstore.collection_sync import (
+    SYNC_MODES,
+    ParallelUploader,
+    create_collection,
+    delete_points,
+    collection_mismatch,
+    existing_points,
+    set_sources,
+    has_sparse_vectors,
+    shadow_collection_name,
+    stable_point_id,
+    swap_alias,
+)
+from src.graph.chunking import Chunker, get_segmenter
+from src.graph.dedup import ChunkDeduplicator
+from src.storage import iter_records
+from src.config import (
+    CLEAN_DATA_PATH, BM25_INDEX_DIR, EMBED_BATCH_SIZE, QDRANT_SYNC_MODE, UPSERT_WORKERS, CHUNK_SEGMENTER, CHUNK_PROCESSES,
+    DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS, COLLECTION_PROFILE, PIPELINE_RUN_ID, FOLLOW_GRACE_SECONDS,
+    ANN_EVAL_QUERIES, ANN_EVAL_K, ANN_MIN_RECALL, ANN_EVAL_FAIL,
+)
+import functools
+import hashlib
+import time
+import itertools
+import numpy as np
 
 # -------- Node 1: Load Clean Data --------
-def load_clean_data():
-    print("📂 Loading cleaned JSON...")
-    with open("data/output/collected_data_clean.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-    print(f"✅ Loaded {len(data)} documents")
-    return data
+def load_clean_data(path=CLEAN_DATA_PATH, follow=False, run_id=PIPELINE_RUN_ID):
+    """Stream cleaned records; with ``follow`` keep reading while this run's cleaning step is still writing."""
+    print(f"📂 Streaming cleaned records from {path}{' (following)' if follow else ''}...")
+    return iter_records(path, follow=follow, run_id=run_id, since=time.time() - FOLLOW_GRACE_SECONDS)
 
 # -------- Node 2: Chunk Text --------
-def chunk_documents(data):
-    print("🧠 Performing targeted chunking for IMF reports...")
-    nlp = spacy.load("en_core_web_trf")
-
-    docs = []
-    for d in data:
-        text = d["content"]
-        meta = {"source": d["source"]}
-
-        # Split on sections, not just sentences
-        sections = re.split(r"(World Economic Outlook|Fiscal Monitor|Global Financial Stability Report|Annex \d+|Table \d+)", text)
-        for sec in sections:
-            if len(sec.strip()) < 50:
-                continue
-            doc_spacy = nlp(sec)
-            chunk = []
-            for sent in doc_spacy.sents:
-                chunk.append(sent.text)
-                if sum(len(s) for s in chunk) > 1200:
-                    docs.append(Document(page_content=" ".join(chunk), metadata=meta))
-                    chunk = []
-            if chunk:
-                docs.append(Document(page_content=" ".join(chunk), metadata=meta))
-
+def chunk_documents(data, segmenter=CHUNK_SEGMENTER):
+    docs = list(iter_chunks(data, segmenter=segmenter))
     print(f"✅ Created {len(docs)} targeted chunks")
     return docs
 
 
+def iter_chunks(data, segmenter=CHUNK_SEGMENTER):
+    """Yield chunks one at a time so the streaming build never holds them all."""
+    print(f"🧠 Performing targeted chunking for IMF reports (segmenter: {segmenter})...")
+    chunker = Chunker(get_segmenter(segmenter, n_process=CHUNK_PROCESSES))
+    yield from chunker.iter_chunks(data)
+
+
+# -------- Node 2b: Near-duplicate removal --------
+def dedup_documents(docs, threshold=DEDUP_THRESHOLD):
+    """Keep one canonical chunk per MinHash/LSH cluster; its ``metadata["sources"]`` lists every source."""
+    return list(iter_dedup(docs, threshold))
+
+
+def iter_dedup(docs, threshold=DEDUP_THRESHOLD):
+    if not threshold:
+        yield from docs
+        return
+    dedup = ChunkDeduplicator(threshold=threshold, num_perm=DEDUP_NUM_PERM, bands=DEDUP_BANDS)
+    yield from dedup.iter_unique(docs)
+    dedup.report()
+
+
 # -------- Node 3: Embed Documents --------
-def embed_documents(docs, use_openai=True):
-    if use_openai:
-        print("🧠 Creating embeddings using OpenAI...")
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-        vectors = [embeddings.embed_query(doc.page_content) for doc in docs]
-    
-    else:
-        try:
-            print("🧠 Creating embeddings using SentenceTransformers (all-MiniLM-L6-v2)...")
-            model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-            vectors = model.encode([doc.page_content for doc in docs], convert_to_numpy=True).tolist()
-        
-        except Exception as e:
-            print(f"⚠️ SentenceTransformers failed: {e}")
-            print("⚠️ Falling back to spaCy medium vectors...")
-            
-            try:
-                nlp = spacy.load("en_core_web_md")
-            except OSError:
-                print("⚠️ Model 'en_core_web_md' not found. Installing...")
-                os.system("python -m spacy download en_core_web_md")
-                nlp = spacy.load("en_core_web_md")
-
-            vectors = []
-            for doc in docs:
-                vec = nlp(doc.page_content).vector
-                if vec is None or len(vec) == 0:
-                    raise ValueError(f"Empty vector for doc: {doc.page_content[:50]}...")
-                vectors.append(vec.tolist())
-
-    print(f"✅ Generated {len(vectors)} vectors of dimension {len(vectors[0])}")
-    return vectors
+def embed_documents(docs, use_openai=True, batch_size=EMBED_BATCH_SIZE, use_cache=True, encoder=None):
+    """Return ``(vectors, model)``: ``model`` is the name of the encoder actually loaded (after any fallback).
+
+    ``encoder`` replaces the one ``get_encoder`` would load (e.g. benchmarks).
+    """
+    encoder = encoder or get_encoder(use_openai, use_cache=use_cache)
+    total = len(docs) if hasattr(docs, "__len__") else None
+    vectors = collect_vectors(embed_batches(docs, encoder, batch_size=batch_size), total=total)
+
+    print(f"✅ Generated {vectors.shape[0]} vectors of dimension {vectors.shape[1]}")
+    report_cache_stats(encoder)
+    return vectors, encoder.name
+
+
+def report_cache_stats(encoder):
+    if isinstance(encoder, CachedEncoder):
+        print(f"💾 Embedding cache: {encoder.hits} hits, {encoder.misses} encoded")
 
 
 # -------- Node 4: Upload to Qdrant --------
-def upload_to_qdrant(vectors, docs, collection_name="rag_collection", use_openai=True):
-    print(f"📡 Uploading vectors to Qdrant collection '{collection_name}'...")
-    qdrant_client = get_qdrant_client()
-    vector_size = len(vectors[0])
-
-    qdrant_client.recreate_collection(
-        collection_name=collection_name,
-        vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+def upload_to_qdrant(vectors, docs, model, collection_name="rag_collection", batch_size=256, mode=QDRANT_SYNC_MODE,
+                     profile=COLLECTION_PROFILE, eval_queries=ANN_EVAL_QUERIES, min_recall=ANN_MIN_RECALL,
+                     fail_on_low_recall=ANN_EVAL_FAIL, **upload_options):
+    """Upload the embedded chunks, stamped with ``model`` (the encoder name ``embed_documents`` returned).
+
+    With ``eval_queries`` the new collection must pass ``evaluate_ann`` before it is published.
+    ``upload_options`` (``client``, ``index_dir``, ``workers``) go to ``upload_batches``.
+    """
+    evaluate = functools.partial(
+        evaluate_ann, docs, vectors, queries=eval_queries, min_recall=min_recall, fail=fail_on_low_recall, profile=profile
+    ) if eval_queries else None
+    batches = (
+        (docs[i:i + batch_size], vectors[i:i + batch_size])
+        for i in range(0, len(docs), batch_size)
     )
+    return upload_batches(batches, collection_name=collection_name, mode=mode, profile=profile,
+                          model=model, evaluate=evaluate, **upload_options)
+
+
+def embed_and_upload(docs, use_openai=True, collection_name="rag_collection", batch_size=EMBED_BATCH_SIZE, use_cache=True,
+                     mode=QDRANT_SYNC_MODE, profile=COLLECTION_PROFILE):
+    """Streaming build: encode batch i+1 while batch i is uploaded; ``docs`` may be a generator."""
+    encoder = get_encoder(use_openai, use_cache=use_cache)
+    result = upload_batches(embed_batches(docs, encoder, batch_size=batch_size), collection_name=collection_name, mode=mode,
+                            profile=profile, model=encoder.name)
+    report_cache_stats(encoder)
+    return result
+
+
+def upload_batches(batches, collection_name="rag_collection", mode=QDRANT_SYNC_MODE, index_dir=BM25_INDEX_DIR,
+                   client=None, workers=UPSERT_WORKERS, profile=COLLECTION_PROFILE, model=None, evaluate=None):
+    """Sync ``(docs, float32 vectors)`` batches into Qdrant as they arrive.
+
+    Point ids are derived from source URL + chunk hash. Modes:
+    - ``recreate``: drop and rebuild the collection in place.
+    - ``incremental``: upsert only ids not already present, then delete stale ones.
+    - ``shadow``: build a fresh collection and swap the ``collection_name`` alias to it.
+
+    Each point also gets a ``bm25`` sparse vector for native hybrid search. New
+    collections are laid out according to ``profile`` (see ``src/vectorstore/profiles.py``).
+    The BM25 snapshot and the collection version are written from the same
+    stream, so nothing but the in-flight batches is held in memory.
+
+    ``model`` (the encoder name) and the vector size are stamped next to the
+    collection version. An incremental build whose model or size differs from
+    the existing collection falls back to a shadow build.
+
+    ``evaluate(collection_name=target, client=client)`` runs once the target holds the full build, before
+    the alias swap, the BM25 snapshot and the version stamp. If it raises, none of
+    those happen and a shadow collection is dropped, so the previous build keeps
+    serving. incremental/recreate builds have already changed the live points by
+    then; only the stamp (and with it query-cache invalidation) is withheld.
+    """
+    if mode not in SYNC_MODES:
+        raise ValueError(f"Unknown sync mode '{mode}', expected one of {SYNC_MODES}")
+
+    qdrant_client = client or get_qdrant_client()
+
+    # Peek at the first batch for the vector size before touching the collection
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        raise ValueError("No documents to upload")
+    dim = first[1].shape[1]
+    batches = itertools.chain([first], batches)
+    if mode == "incremental":
+        mismatch = collection_mismatch(qdrant_client, collection_name, dim, model)
+        if mismatch:
+            print(f"⚠️ {mismatch}; building a shadow collection instead of upserting")
+            mode = "shadow"
+
+    target = shadow_collection_name(collection_name) if mode == "shadow" else collection_name
+    print(f"📡 Syncing vectors to Qdrant collection '{target}' ({mode})...")
+
+    existing = existing_points(qdrant_client, target) if mode == "incremental" else {}
+    # Existing points whose merged duplicate sources changed since they were uploaded
+    source_updates = []
+    uploader = ParallelUploader(qdrant_client, target, workers=workers)
+    snapshot = SnapshotWriter(index_dir, collection_name)
+    version = hashlib.sha1()
+    # A different model gives a different version even for identical chunks
+    version.update(f"{model}\0".encode("utf-8"))
+    seen = set()
+    total = uploaded = 0
+    sparse = False
+
+    try:
+        for batch_docs, batch_vectors in batches:
+            if total == 0:
+                create_collection(qdrant_client, target, dim, recreate=(mode == "recreate"),
+                                  profile=profile)
+                sparse = has_sparse_vectors(qdrant_client, target)
+                if not sparse:
+                    print(f"⚠️ '{target}' has no sparse vectors; rebuild with --sync-mode shadow or recreate "
+                          f"to use RETRIEVAL_MODE=native")
+
+            rows, ids, payloads, sparse_vectors = [], [], [], []
+            for row, doc in enumerate(batch_docs):
+                source = doc.metadata.get("source", "")
+                point_id = stable_point_id(source, doc.page_content)
+                if point_id in seen:
+                    continue
+                seen.add(point_id)
+
+                sources = doc.metadata.get("sources", [source])
+                payload = {"page_content": doc.page_content, "source": source, "sources": sources}
+                update_version(version, point_id, doc.page_content, sources)
+                if doc.page_content.strip():
+                    snapshot.add(doc.page_content, {"_id": point_id, "source": source, "sources": sources})
+
+                # Unchanged chunks keep their id, so they are already in the collection;
+                # only their sources may need refreshing
+                if point_id in existing:
+                    raw_id, existing_sources = existing[point_id]
+                    if existing_sources != sources:
+                        source_updates.append((raw_id, sources))
+                else:
+                    rows.append(row)
+                    ids.append(point_id)
+                    payloads.append(payload)
+                    if sparse:
+                        sparse_vectors.append(sparse_doc_vector(doc.page_content))
+
+            if ids:
+                uploader.submit(ids, batch_vectors[rows], payloads, sparse_vectors if sparse else None)
+            total += len(batch_docs)
+            uploaded += len(ids)
+            print(f"  ✅ Processed {total} chunks ({uploaded} upserted)")
+        uploader.close()
+    except BaseException:
+        uploader.abort()
+        snapshot.abort()
+        raise
+
+    if total == 0:
+        snapshot.abort()
+        raise ValueError("No documents to upload")
+
+    if source_updates:
+        print(f"🔗 Updating sources of {set_sources(qdrant_client, target, source_updates)} existing points")
+    stale = [raw_id for key, (raw_id, _) in existing.items() if key not in seen]
+    if stale:
+        delete_points(qdrant_client, target, stale)
+
+    if evaluate is not None:
+        try:
+            evaluate(collection_name=target, client=qdrant_client)
+        except BaseException:
+            snapshot.abort()
+            if mode == "shadow":
+                qdrant_client.delete_collection(target)
+                print(f"🗑 Dropped '{target}'; '{collection_name}' still serves the previous build")
+            raise
+
+    if mode == "shadow":
+        swap_alias(qdrant_client, collection_name, target)
+
+    print(f"✅ Qdrant collection '{collection_name}' holds {len(seen)} vectors "
+          f"({uploaded} upserted, {len(stale)} deleted, {len(seen) - uploaded} unchanged)")
+    write_lexical_index(qdrant_client, collection_name, snapshot, version.hexdigest()[:16], model=model, dim=dim)
+    return f"✅ Qdrant now contains {len(seen)} vectors"
+
+
+def update_version(version, point_id, text, sources=()):
+    """Fold one point into the build fingerprint: identical chunks, ids and sources give the same version."""
+    version.update(str(point_id).encode("utf-8"))
+    version.update(b"\0")
+    version.update(text.encode("utf-8"))
+    version.update(b"\0")
+    version.update("\n".join(sources).encode("utf-8"))
+    version.update(b"\0")
+
+
+def write_lexical_index(qdrant_client, collection_name, snapshot, version, model=None, dim=None):
+    """Publish the BM25 snapshot for the query side, then stamp the collection version."""
+    snapshot.commit(version)
+    # Stamp last: readers only trust a snapshot whose version matches this
+    write_collection_version(qdrant_client, collection_name, version, model=model, dim=dim)
+    print(f"💾 BM25 snapshot written to {snapshot.path} (version {version})")
+    return version
+
+
+# -------- ANN recall gate (run by upload_batches before publishing) --------
+def evaluate_ann(docs, vectors, collection_name="rag_collection", queries=ANN_EVAL_QUERIES, k=ANN_EVAL_K,
+                 min_recall=ANN_MIN_RECALL, fail=ANN_EVAL_FAIL, profile=COLLECTION_PROFILE, client=None, seed=0):
+    """Recall@k and latency of Qdrant's ANN search against exact top-k over the vectors just embedded.
+
+    A sample of the chunk vectors serves as the query set, so nothing is
+    re-embedded; rows and points are matched by their stable ids. Below
+    ``min_recall`` the build warns, or fails with ``fail``. Waits for Qdrant to
+    finish indexing first, since unindexed segments are searched exactly.
+    """
+    if not queries:
+        return None
+    # One row per point: duplicate chunks collapse to the same id on upload
+    first_row = {}
+    for row, doc in enumerate(docs):
+        first_row.setdefault(stable_point_id(doc.metadata.get("source", ""), doc.page_content), row)
+    ids = list(first_row)
+    corpus = vectors[list(first_row.values())]
+
+    rng = np.random.default_rng(seed)
+    sample = corpus[rng.choice(len(corpus), size=min(queries, len(corpus)), replace=False)]
+    print(f"🎯 Evaluating ANN recall@{k} on {len(sample)} sampled queries over {len(corpus)} vectors...")
+
+    exact = [[ids[i] for i in row] for row in exact_top_k(corpus, sample, k)]
+    client = client or get_qdrant_client()
+    wait_for_index(client, collection_name)
+    ann, latencies = ann_top_k(client, collection_name, sample, k, search_params(profile))
+    recall = recall_at_k(exact, ann, k)
+    p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95])
+    report = {"recall": round(recall, 4), "k": k, "queries": len(sample), "p50_ms": round(float(p50), 2),
+              "p95_ms": round(float(p95), 2)}
+    print(f"  recall@{k} {recall:.3f}, p50 {report['p50_ms']} ms, p95 {report['p95_ms']} ms")
 
-    points = [
-        PointStruct(
-            id=i,
-            vector=vectors[i],
-            payload={
-                "page_content": docs[i].page_content,  
-                "source": docs[i].metadata.get("source", "")
-            }
-        )
-        for i in range(len(docs))
-    ]
-    qdrant_client.upsert(collection_name=collection_name, points=points)
-    print(f"✅ Uploaded {len(points)} vectors to Qdrant collection '{collection_name}'")
-    return f"✅ Qdrant now contains {len(points)} vectors"
+    if recall < min_recall:
+        message = (f"ANN recall@{k} {recall:.3f} is below {min_recall}; raise SEARCH_HNSW_EF or "
+                   f"use a less aggressive collection profile")
+        if fail:
+            raise RuntimeError(message)
+        print(f"⚠️ {message}")
+    return report
@@ -1,5 +1,6 @@
 from .web_crawler import crawl_site
-from .pdf_loader import load_pdfs
+from .pdf_loader import load_pdfs, iter_pdfs
 from .table_extractor import extract_tables_from_html
+from .http_cache import HttpCache, write_changes
 
-__all__ = ["crawl_site", "load_pdfs", "extract_tables_from_html"]
\ No newline at end of file
+__all__ = ["crawl_site", "load_pdfs", "iter_pdfs", "extract_tables_from_html", "HttpCache", "write_changes"]
\ No newline at end of file
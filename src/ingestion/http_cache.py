@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import time
+
+NEW, MODIFIED, UNCHANGED = "new", "modified", "unchanged"
+
+
+class HttpCache:
+    """On-disk HTTP cache keyed by URL, used for conditional re-crawls.
+
+    For every URL it keeps the response body plus its validators (ETag,
+    Last-Modified) and a SHA-256 of the body. ``conditional_headers`` turns
+    those into If-None-Match / If-Modified-Since, and ``store`` reports whether
+    a fresh body is new, modified, or byte-identical to the cached one.
+    """
+
+    def __init__(self, cache_dir="data/cache/http"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _meta_path(self, url):
+        return os.path.join(self.cache_dir, f"{self._key(url)}.json")
+
+    def entry(self, url):
+        try:
+            with open(self._meta_path(url), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # A validator is useless without the body it describes
+        return meta if os.path.exists(meta.get("body_path", "")) else None
+
+    def conditional_headers(self, url):
+        meta = self.entry(url)
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def read(self, url):
+        """Cached body bytes and entry, e.g. after a 304."""
+        meta = self.entry(url)
+        if meta is None:
+            return None, None
+        with open(meta["body_path"], "rb") as f:
+            return f.read(), meta
+
+    def store(self, url, body, headers, body_path=None, charset=None):
+        """Save a 200 response and return NEW, MODIFIED or UNCHANGED."""
+        return self.store_stream(url, [body], headers, body_path=body_path, charset=charset)
+
+    def store_stream(self, url, chunks, headers, body_path=None, charset=None):
+        """Like ``store`` but writes the body chunk by chunk, never holding it in memory."""
+        previous = self.entry(url)
+        body_path = body_path or (previous or {}).get("body_path") or os.path.join(self.cache_dir, f"{self._key(url)}.body")
+        os.makedirs(os.path.dirname(body_path) or ".", exist_ok=True)
+
+        sha = hashlib.sha256()
+        tmp_path = f"{body_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                sha.update(chunk)
+                f.write(chunk)
+        digest = sha.hexdigest()
+
+        if previous is not None and previous["sha256"] == digest and previous["body_path"] == body_path:
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, body_path)
+
+        self._write_meta(url, headers, digest, body_path, charset)
+        if previous is None:
+            return NEW
+        return UNCHANGED if previous["sha256"] == digest else MODIFIED
+
+    def touch(self, url, headers=None):
+        """Record a 304: refresh validators the server may have rotated."""
+        meta = self.entry(url)
+        if meta is not None:
+            self._write_meta(url, headers or {}, meta["sha256"], meta["body_path"], meta.get("charset"), previous=meta)
+        return UNCHANGED
+
+    def _write_meta(self, url, headers, digest, body_path, charset, previous=None):
+        previous = previous or {}
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag") or previous.get("etag"),
+            "last_modified": headers.get("Last-Modified") or previous.get("last_modified"),
+            "sha256": digest,
+            "body_path": body_path,
+            "charset": charset,
+            "fetched_at": time.time(),
+        }
+        _atomic_write(self._meta_path(url), json.dumps(meta).encode("utf-8"))
+
+
+def _atomic_write(path, data):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_changes(changes, path="data/output/changed_urls.json"):
+    """Persist ``{url: new|modified|unchanged}`` so later stages can process only what changed."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(changes, f, ensure_ascii=False, indent=2)
+    counts = {status: sum(1 for s in changes.values() if s == status) for status in (NEW, MODIFIED, UNCHANGED)}
+    print(f"🔁 Change log saved to {path}: {counts[NEW]} new, {counts[MODIFIED]} modified, {counts[UNCHANGED]} unchanged")
@@ -1,67 +1,158 @@
 import os
+import json
+import mmap
+import signal
 import requests
-import PyPDF2
 import pdfplumber
-from io import BytesIO
-from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import hashlib
+from .http_cache import NEW, UNCHANGED
+
+DOWNLOAD_CHUNK = 1 << 16
 
 def safe_filename(url, ext):
     """Short hash-based filename to avoid long names."""
     hash_part = hashlib.md5(url.encode()).hexdigest()[:12]
     return f"{hash_part}.{ext}"
 
-def extract_text_and_tables_from_pdf(url, save_dir="data/pdfs"):
-    os.makedirs(save_dir, exist_ok=True)
+def _extraction_path(pdf_path):
+    return f"{pdf_path}.extract.json"
+
+def _load_extraction(pdf_path):
     try:
-        resp = requests.get(url, timeout=20)
+        with open(_extraction_path(pdf_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data["text"], data["tables"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _download(url, pdf_path, http_cache):
+    """Stream the PDF to ``pdf_path``; returns its new/modified/unchanged status."""
+    headers = http_cache.conditional_headers(url) if http_cache else {}
+    with requests.get(url, headers=headers, timeout=20, stream=True) as resp:
+        if resp.status_code == 304 and http_cache:
+            return http_cache.touch(url, resp.headers)
         resp.raise_for_status()
+        chunks = resp.iter_content(chunk_size=DOWNLOAD_CHUNK)
+        if http_cache:
+            return http_cache.store_stream(url, chunks, resp.headers, body_path=pdf_path)
+        with open(pdf_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return NEW
 
-        filename = safe_filename(url, "pdf")
-        pdf_path = os.path.join(save_dir, filename)
+def _parse_pdf(pdf_path):
+    """Text and tables in a single pass over the pages of one memory-mapped parse."""
+    pages_text = []
+    tables = []
+    with open(pdf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with pdfplumber.open(mm) as pdf:
+            for page in pdf.pages:
+                pages_text.append(page.extract_text() or "")
+                tables.extend(page.extract_tables())
+                # Release cached layout objects; long reports otherwise grow without bound
+                page.flush_cache()
+    return "\n".join(pages_text), tables
 
-        with open(pdf_path, "wb") as f:
-            f.write(resp.content)
+def extract_text_and_tables_from_pdf(url, save_dir="data/pdfs", http_cache=None):
+    """Returns ``(pdf_path, text, tables, status)``; status is new/modified/unchanged.
 
-        # Extract text
-        text_reader = PyPDF2.PdfReader(BytesIO(resp.content))
-        text_content = "\n".join(page.extract_text() or "" for page in text_reader.pages)
+    With an ``http_cache`` the download is conditional, and an unchanged PDF
+    (304 or same content hash) reuses its previous extraction.
+    """
+    os.makedirs(save_dir, exist_ok=True)
+    pdf_path = os.path.join(save_dir, safe_filename(url, "pdf"))
+    try:
+        status = _download(url, pdf_path, http_cache)
 
-        # Extract tables
-        tables = []
-        with pdfplumber.open(BytesIO(resp.content)) as pdf:
-            for page in pdf.pages:
-                for table in page.extract_tables():
-                    tables.append(table)
+        if status == UNCHANGED:
+            previous = _load_extraction(pdf_path)
+            if previous is not None:
+                return pdf_path, previous[0], previous[1], status
+
+        text_content, tables = _parse_pdf(pdf_path)
 
-        return pdf_path, text_content, tables
+        with open(_extraction_path(pdf_path), "w", encoding="utf-8") as f:
+            json.dump({"text": text_content, "tables": tables}, f, ensure_ascii=False)
+
+        return pdf_path, text_content, tables, status
     except Exception as e:
         print(f"PDF processing error for {url}: {e}")
-        return None, "", []
+        return None, "", [], None
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("PDF extraction timed out")
+
+def _extract_with_timeout(url, save_dir, http_cache, timeout):
+    # Runs in a pool worker: SIGALRM interrupts a PDF that takes too long to parse
+    use_alarm = timeout and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.alarm(int(timeout))
+    try:
+        return url, extract_text_and_tables_from_pdf(url, save_dir=save_dir, http_cache=http_cache)
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+
+def iter_pdf_extractions(urls, save_dir="data/pdfs", http_cache=None, workers=None, timeout=300):
+    """Extract PDFs on a process pool and yield ``(url, (pdf_path, text, tables, status))`` as each finishes.
+
+    A slow PDF never blocks the ones behind it, and one that exceeds
+    ``timeout`` seconds is reported as failed.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_extract_with_timeout, url, save_dir, http_cache, timeout): url
+            for url in urls
+        }
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"PDF processing error for {url}: {e}")
+                yield url, (None, "", [], None)
 
-def load_pdfs(results, text_dir="data/pdf_texts", tables_dir="data/pdf_tables"):
+def iter_pdfs(results, text_dir="data/pdf_texts", tables_dir="data/pdf_tables", http_cache=None, workers=None, timeout=300):
+    """Yield ``(pdf_doc, table_entries)`` per PDF as soon as its extraction completes."""
     os.makedirs(text_dir, exist_ok=True)
     os.makedirs(tables_dir, exist_ok=True)
 
+    urls = [item["url"] for item in results if item.get("pdf")]
+    for url, (pdf_path, text, tables, status) in iter_pdf_extractions(
+        urls, http_cache=http_cache, workers=workers, timeout=timeout
+    ):
+        if not pdf_path:
+            continue
+        changed = status != UNCHANGED
+        text_file = os.path.join(text_dir, safe_filename(url, "txt"))
+        if changed or not os.path.exists(text_file):
+            with open(text_file, "w", encoding="utf8") as f:
+                f.write(text)
+
+        pdf_doc = {"source": url, "content": text, "pdf_path": pdf_path, "status": status, "changed": changed}
+
+        table_entries = []
+        for idx, table in enumerate(tables):
+            table_file = os.path.join(tables_dir, f"{safe_filename(url, 'table')}_{idx}.csv")
+            if changed or not os.path.exists(table_file):
+                with open(table_file, "w", encoding="utf8") as tf:
+                    for row in table:
+                        tf.write(",".join(str(cell) if cell else "" for cell in row) + "\n")
+            table_entries.append({"source": url, "table": table, "table_path": table_file, "changed": changed})
+
+        yield pdf_doc, table_entries
+
+def load_pdfs(results, text_dir="data/pdf_texts", tables_dir="data/pdf_tables", http_cache=None, workers=None, timeout=300):
     pdf_docs = []
     table_entries = []
 
-    for item in results:
-        if item.get("pdf"):
-            url = item["url"]
-            pdf_path, text, tables = extract_text_and_tables_from_pdf(url)
-            if pdf_path:
-                text_file = os.path.join(text_dir, safe_filename(url, "txt"))
-                with open(text_file, "w", encoding="utf8") as f:
-                    f.write(text)
-                
-                pdf_docs.append({"source": url, "content": text, "pdf_path": pdf_path})
-
-                for idx, table in enumerate(tables):
-                    table_file = os.path.join(tables_dir, f"{safe_filename(url, 'table')}_{idx}.csv")
-                    with open(table_file, "w", encoding="utf8") as tf:
-                        for row in table:
-                            tf.write(",".join(str(cell) if cell else "" for cell in row) + "\n")
-                    table_entries.append({"source": url, "table": table, "table_path": table_file})
-    
+    for pdf_doc, tables in iter_pdfs(results, text_dir, tables_dir, http_cache=http_cache, workers=workers, timeout=timeout):
+        pdf_docs.append(pdf_doc)
+        table_entries.extend(tables)
+
     return pdf_docs, table_entries
@@ -1,53 +1,166 @@
-import requests
+import asyncio
+import aiohttp
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlunparse
 import os
 import csv
+import json
+from .http_cache import NEW, UNCHANGED
 
-def crawl_site(start_url, max_pages=50):
-    visited = set()
-    results = []
-
-    fail_log_path = "data/output/failed_links.csv"
-    os.makedirs("data/output", exist_ok=True)
-    with open(fail_log_path, "w", newline="", encoding="utf-8") as fail_file:
-        writer = csv.writer(fail_file)
-        writer.writerow(["Failed URL", "Reason"])
-
-    def log_failed(url, reason):
-        print(f"⚠️ Failed: {url} ({reason})")
-        with open(fail_log_path, "a", newline="", encoding="utf-8") as fail_file:
-            writer = csv.writer(fail_file)
-            writer.writerow([url, reason])
-
-    def crawl(url):
-        if url in visited or len(visited) >= max_pages:
-            return
-        visited.add(url)
-
-        try:
-            r = requests.get(url, timeout=10)
-            if r.status_code != 200:
-                log_failed(url, f"HTTP {r.status_code}")
-                return
-
-            soup = BeautifulSoup(r.text, "html.parser")
-            text = soup.get_text(separator=" ").strip()
-            results.append({"url": url, "content": text})
+DEFAULT_PORTS = {"http": 80, "https": 443}
 
+
+def normalize_url(url):
+    """Canonical form used for dedup: lowercase scheme/host, no default port, no fragment."""
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    netloc = host if parsed.port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{parsed.port}"
+    return urlunparse((scheme, netloc, parsed.path or "/", parsed.params, parsed.query, ""))
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least ``min_interval`` seconds apart."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.next_slot = {}
+
+    async def wait(self, host):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self.next_slot.get(host, now))
+        self.next_slot[host] = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def crawl_site_async(
+    start_url,
+    max_pages=50,
+    concurrency=8,
+    host_delay=0.25,
+    timeout=10,
+    output_path="data/output/crawled_pages.jsonl",
+    fail_log_path="data/output/failed_links.csv",
+    http_cache=None,
+    on_record=None
+):
+    """Breadth-first crawl of ``start_url``'s domain with ``concurrency`` workers.
+
+    Pages and PDF links are appended to ``output_path`` (one JSON object per
+    line) as soon as they are found and passed to ``on_record`` if given.
+    Page contents are not kept: only the PDF link records are returned, so
+    memory does not grow with the size of the crawl.
+
+    With an ``http_cache`` pages are fetched conditionally; each page record
+    carries ``changed`` and the returned list's ``changes`` maps URL -> status.
+    """
+    start_url = normalize_url(start_url)
+    domain = urlparse(start_url).netloc
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    os.makedirs(os.path.dirname(fail_log_path), exist_ok=True)
+
+    frontier = asyncio.Queue()
+    scheduled = {start_url}
+    pdfs_seen = set()
+    pdf_records = []
+    changes = {}
+    limiter = HostRateLimiter(host_delay)
+    frontier.put_nowait(start_url)
+
+    with open(output_path, "w", encoding="utf-8") as out_file, \
+         open(fail_log_path, "w", newline="", encoding="utf-8") as fail_file:
+        fail_writer = csv.writer(fail_file)
+        fail_writer.writerow(["Failed URL", "Reason"])
+
+        def emit(record):
+            if record.get("pdf"):
+                pdf_records.append(record)
+            out_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out_file.flush()
+            if on_record is not None:
+                on_record(record)
+
+        def log_failed(url, reason):
+            print(f"⚠️ Failed: {url} ({reason})")
+            fail_writer.writerow([url, reason])
+            fail_file.flush()
+
+        def enqueue_links(page_url, soup):
             for link in soup.find_all("a", href=True):
-                absolute = urljoin(url, link["href"])
+                absolute = normalize_url(urljoin(page_url, link["href"]))
                 # Same domain check
-                if urlparse(absolute).netloc == urlparse(start_url).netloc:
-                    # Always collect PDFs
-                    if absolute.lower().endswith(".pdf"):
-                        results.append({"url": absolute, "pdf": True})
-                    # Crawl HTML pages (detail pages, listings, etc.)
-                    elif absolute not in visited:
-                        crawl(absolute)
-
-        except Exception as e:
-            log_failed(url, str(e))
-
-    crawl(start_url)
-    return results
+                if urlparse(absolute).netloc != domain:
+                    continue
+                # Always collect PDFs
+                if absolute.lower().endswith(".pdf"):
+                    if absolute not in pdfs_seen:
+                        pdfs_seen.add(absolute)
+                        emit({"url": absolute, "pdf": True})
+                # Crawl HTML pages (detail pages, listings, etc.)
+                elif absolute not in scheduled and len(scheduled) < max_pages:
+                    scheduled.add(absolute)
+                    frontier.put_nowait(absolute)
+
+        async def fetch(session, url):
+            await limiter.wait(domain)
+            try:
+                headers = http_cache.conditional_headers(url) if http_cache else {}
+                async with session.get(url, headers=headers) as r:
+                    if r.status == 304 and http_cache:
+                        body, meta = http_cache.read(url)
+                        charset = meta["charset"]
+                        status = http_cache.touch(url, r.headers)
+                    elif r.status == 200:
+                        body = await r.read()
+                        charset = r.charset
+                        status = http_cache.store(url, body, r.headers, charset=charset) if http_cache else NEW
+                    else:
+                        log_failed(url, f"HTTP {r.status}")
+                        return
+                html = body.decode(charset or "utf-8", errors="replace")
+
+                # Unchanged pages are still parsed: their links lead to pages that may have changed
+                soup = BeautifulSoup(html, "html.parser")
+                text = soup.get_text(separator=" ").strip()
+                emit({"url": url, "content": text, "changed": status != UNCHANGED})
+                changes[url] = status
+                enqueue_links(url, soup)
+            except Exception as e:
+                log_failed(url, str(e) or type(e).__name__)
+
+        async def worker(session):
+            while True:
+                url = await frontier.get()
+                try:
+                    await fetch(session, url)
+                finally:
+                    frontier.task_done()
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+            workers = [asyncio.create_task(worker(session)) for _ in range(concurrency)]
+            await frontier.join()
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    return CrawlResults(pdf_records, changes)
+
+
+class CrawlResults(list):
+    """PDF link records, plus ``changes``: ``{url: new|modified|unchanged}`` for fetched pages."""
+
+    def __init__(self, pdf_records, changes):
+        super().__init__(pdf_records)
+        self.changes = changes
+
+    @property
+    def page_count(self):
+        return len(self.changes)
+
+
+def crawl_site(start_url, max_pages=50, **kwargs):
+    return asyncio.run(crawl_site_async(start_url, max_pages=max_pages, **kwargs))
@@ -0,0 +1,234 @@
+# src/llm/query_cache.py
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from src.metrics import CACHE_LOOKUPS
+
+MISSING = object()
+
+
+def normalize_query(query):
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", query.lower()).strip().rstrip("?!. ")
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries also expire ``ttl`` seconds after being set."""
+
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key, MISSING)
+            if item is MISSING:
+                return MISSING
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SemanticCache:
+    """Answers indexed by query embedding; a lookup hits when cosine similarity >= ``threshold``.
+
+    Embeddings live in one preallocated float32 matrix, so a lookup is a single
+    matrix-vector product. When full, the least recently used slot is reused.
+    """
+
+    def __init__(self, threshold=0.95, maxsize=1024, ttl=3600):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._vectors = None
+        self._values = [None] * maxsize
+        self._expires = np.zeros(maxsize)
+        self._last_used = np.zeros(maxsize)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, vector):
+        q = self._unit(vector)
+        with self._lock:
+            if self._size == 0:
+                return MISSING
+            now = time.monotonic()
+            sims = self._vectors[:self._size] @ q
+            sims[self._expires[:self._size] < now] = -np.inf
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return MISSING
+            self._last_used[best] = now
+            return self._values[best]
+
+    def set(self, vector, value):
+        v = self._unit(vector)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.maxsize, v.shape[0]), dtype=np.float32)
+            now = time.monotonic()
+            if self._size < self.maxsize:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+            self._vectors[slot] = v
+            self._values[slot] = value
+            self._expires[slot] = now + self.ttl
+            self._last_used[slot] = now
+
+    def clear(self):
+        with self._lock:
+            self._values = [None] * self.maxsize
+            self._size = 0
+
+    def __len__(self):
+        return self._size
+
+
+class QueryCache:
+    """Three-tier cache in front of RAGPipeline.
+
+    - ``answer``: exact question -> answer + documents
+    - ``retrieval``: normalized question -> reranked documents
+    - ``semantic`` (optional): question embedding within a cosine threshold -> answer
+
+    Every tier is dropped when the collection version written by the build
+    graph changes, and ``on_version_change`` is called with the new version.
+    ``version_fn`` is polled every ``version_check_interval`` seconds from a
+    background thread (started by the first lookup), so lookups never wait on it.
+    """
+
+    TIERS = ("answer", "retrieval", "semantic")
+
+    def __init__(self, version_fn=None, maxsize=1024, answer_ttl=3600, retrieval_ttl=3600,
+                 semantic_threshold=None, version_check_interval=30, on_version_change=None):
+        self.answers = TTLCache(maxsize=maxsize, ttl=answer_ttl)
+        self.retrievals = TTLCache(maxsize=maxsize, ttl=retrieval_ttl)
+        self.semantic = SemanticCache(semantic_threshold, maxsize=maxsize, ttl=answer_ttl) if semantic_threshold else None
+        self.version_fn = version_fn
+        self.version_check_interval = version_check_interval
+        # Called with the new version after the tiers are cleared (e.g. to reload the BM25 index)
+        self.on_version_change = on_version_change
+        self.version = None
+        self._version_lock = threading.Lock()
+        self._poller = None
+        self._stop = threading.Event()
+        self.hits = dict.fromkeys(self.TIERS, 0)
+        self.misses = dict.fromkeys(self.TIERS, 0)
+
+    def check_version(self):
+        """Start the version poller if it is not running yet; no I/O on the calling thread."""
+        if self.version_fn is None or self._poller is not None:
+            return
+        with self._version_lock:
+            if self._poller is None and not self._stop.is_set():
+                self._poller = threading.Thread(target=self._poll, name="query-cache-version", daemon=True)
+                self._poller.start()
+
+    def refresh_version(self):
+        """Read the collection version now and drop every tier if it changed."""
+        if self.version_fn is None:
+            return
+        try:
+            version = self.version_fn()
+        except Exception as e:
+            print(f"⚠️ Could not read collection version: {e}")
+            return
+        with self._version_lock:
+            if version == self.version:
+                return
+            if self.version is not None:
+                print(f"🔁 Collection version changed ({self.version} -> {version}), clearing query cache")
+            self.clear()
+            self.version = version
+        if self.on_version_change is not None:
+            self.on_version_change(version)
+
+    def _poll(self):
+        if self.version is None:
+            self.refresh_version()
+        while not self._stop.wait(self.version_check_interval):
+            self.refresh_version()
+
+    def close(self):
+        """Stop the version poller."""
+        self._stop.set()
+        poller = self._poller
+        if poller is not None and poller is not threading.current_thread():
+            poller.join(timeout=5)
+
+    def _count(self, tier, value):
+        if value is MISSING:
+            self.misses[tier] += 1
+            CACHE_LOOKUPS.labels(tier, "miss").inc()
+        else:
+            self.hits[tier] += 1
+            CACHE_LOOKUPS.labels(tier, "hit").inc()
+        return value
+
+    def get_answer(self, question):
+        self.check_version()
+        return self._count("answer", self.answers.get(question.strip()))
+
+    def get_semantic(self, vector):
+        if self.semantic is None:
+            return MISSING
+        return self._count("semantic", self.semantic.get(vector))
+
+    def get_retrieval(self, question):
+        self.check_version()
+        return self._count("retrieval", self.retrievals.get(normalize_query(question)))
+
+    def set_retrieval(self, question, documents):
+        self.retrievals.set(normalize_query(question), documents)
+
+    def set_answer(self, question, result, vector=None):
+        self.answers.set(question.strip(), result)
+        if self.semantic is not None and vector is not None:
+            self.semantic.set(vector, result)
+
+    def clear(self):
+        self.answers.clear()
+        self.retrievals.clear()
+        if self.semantic is not None:
+            self.semantic.clear()
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "sizes": {
+                "answer": len(self.answers),
+                "retrieval": len(self.retrievals),
+                "semantic": len(self.semantic) if self.semantic is not None else 0,
+            },
+        }
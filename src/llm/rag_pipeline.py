@@ -1,79 +1,231 @@
 from src.retrieval.hybrid_search import HybridRetriever
+from src.retrieval.native_hybrid import NativeHybridRetriever
 from src.retrieval.bm25_search import BM25Retriever
 from src.retrieval.reranker import Reranker
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_qdrant import Qdrant
-from qdrant_client import QdrantClient
+from src.llm.query_cache import QueryCache, MISSING
+from src import registry
+from src.vectorstore.qdrant_setup import get_qdrant_client, read_collection_version
+from src.config import BM25_INDEX_DIR, QUERY_CACHE_SIZE, QUERY_CACHE_TTL, SEMANTIC_CACHE_THRESHOLD, RETRIEVAL_MODE
+from src.metrics import stage, observe_stage, observe_candidates
 import ollama
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_MODEL = "llama3.1:8b"
 
 class RAGPipeline:
-    def __init__(self):
-        # Embeddings
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    def __init__(self, retrieval_mode=RETRIEVAL_MODE, client=None, embeddings=None, reranker=None, llm=None,
+                 async_llm=None, collection_name="rag_collection", index_dir=BM25_INDEX_DIR):
+        """Components default to the shared instances in ``src.registry``; pass them in to replace them (e.g. benchmarks)."""
+        # Embeddings (PyTorch or int8 ONNX, per INFERENCE_BACKEND)
+        self.embeddings = embeddings or registry.embeddings()
 
         # Qdrant store
-        self.qdrant_store = Qdrant.from_existing_collection(
-            embedding=embeddings,
-            collection_name="rag_collection",
-            url="http://localhost:6333"
-        )
+        client = client or get_qdrant_client()
+        self.client = client
+        self.qdrant_store = Qdrant(client=client, collection_name=collection_name, embeddings=self.embeddings)
 
-        # BM25 retriever from Qdrant payload
-        client = QdrantClient(host="localhost", port=6333)
-        bm25_docs = []
-        offset = None
-        batch_size = 100
-        batch_count = 0
-
-        print("📡 Loading BM25 documents from Qdrant in batches...")
-        while True:
-            scroll_res, next_offset = client.scroll(
-                collection_name="rag_collection",
-                limit=batch_size,
-                offset=offset
-            )
-            
-            if not scroll_res:  # No more results
-                break
-            
-            for point in scroll_res:
-                if "text" in point.payload and point.payload["text"].strip():
-                    bm25_docs.append(point.payload["text"])
-                elif "page_content" in point.payload and point.payload["page_content"].strip():
-                    bm25_docs.append(point.payload["page_content"])
-                        
-            batch_count += 1
-            print(f"  ✅ Loaded batch {batch_count} ({len(bm25_docs)} docs total)")
-            
-            if next_offset is None:  # End of collection
-                break
-            offset = next_offset
-
-        print(f"📡 Finished loading BM25 docs. Total: {len(bm25_docs)}")
-
-        self.bm25_retriever = BM25Retriever(bm25_docs, collection_name="rag_collection")
-
-        # Hybrid retriever
-        self.hybrid_retriever = HybridRetriever(self.qdrant_store, self.bm25_retriever)
+        if retrieval_mode == "native":
+            # Qdrant fuses dense + sparse bm25 server-side; no corpus copy in this process
+            self.bm25_retriever = None
+            self.hybrid_retriever = NativeHybridRetriever(client, collection_name, self.embeddings)
+        elif retrieval_mode == "client":
+            # BM25 retriever: memory-maps the build snapshot on first search,
+            # scrolling Qdrant only if the snapshot is missing or stale
+            self.bm25_retriever = BM25Retriever(collection_name=collection_name, client=client, index_dir=index_dir)
+
+            # Hybrid retriever
+            self.hybrid_retriever = HybridRetriever(self.qdrant_store, self.bm25_retriever)
+        else:
+            raise ValueError(f"Unknown retrieval mode '{retrieval_mode}', expected 'client' or 'native'")
 
         # Reranker
-        self.reranker = Reranker()
+        self.reranker = reranker or Reranker()
+
+        # Ollama clients for query / aquery
+        self.llm = llm or ollama.Client()
+        self.async_llm = async_llm or ollama.AsyncClient()
+
+        # Answer / retrieval / semantic cache, invalidated when a build changes the collection version
+        self.cache = QueryCache(
+            version_fn=lambda: read_collection_version(client, collection_name),
+            maxsize=QUERY_CACHE_SIZE,
+            answer_ttl=QUERY_CACHE_TTL,
+            retrieval_ttl=QUERY_CACHE_TTL,
+            semantic_threshold=SEMANTIC_CACHE_THRESHOLD,
+            # A rebuild also makes the lexical leg stale: reload it on the next search
+            on_version_change=self.bm25_retriever.invalidate if self.bm25_retriever is not None else None
+        )
+
+    def warmup(self, question="IMF global growth outlook"):
+        """Load everything the first request would: models, BM25 snapshot, collection version.
+
+        Returns ``{component: seconds}``.
+        """
+        timings = {}
+        start = time.perf_counter()
+        self.embeddings.embed_query(question)
+        timings["embedding"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.reranker.score_pairs([(question, question)])
+        timings["reranker"] = time.perf_counter() - start
+
+        if self.bm25_retriever is not None:
+            start = time.perf_counter()
+            self.bm25_retriever.load()
+            timings["bm25"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.cache.refresh_version()
+        timings["qdrant"] = time.perf_counter() - start
+        self.cache.check_version()
+        return {name: round(seconds, 3) for name, seconds in timings.items()}
+
+    def close(self):
+        """Stop the query cache's background version poller."""
+        self.cache.close()
 
     def query(self, question):
-        # 1️⃣ Retrieve candidates
-        candidates = self.hybrid_retriever.search(question, k=15)
+        with stage("query_total"):
+            # 0️⃣ Answer cache (exact, then semantic)
+            cached, vector = self._cached_answer(question)
+            if cached is not MISSING:
+                return cached["answer"]
+
+            # 1️⃣ Retrieve + rerank
+            ranked = self.retrieve(question, vector)
+
+            # 2️⃣ Prompt
+            prompt = self.build_prompt(question, ranked)
+
+            # 3️⃣ Call Llama 3.1 locally
+            with stage("llm_total"):
+                response = self.llm.chat(model=OLLAMA_MODEL, messages=[{"role":"user", "content":prompt}])
+            answer = response["message"]["content"]
+            self.cache.set_answer(question, {"answer": answer, "documents": ranked}, vector)
+            return answer
+
+    async def aquery(self, question):
+        """Async query: returns ``{"answer", "documents"}`` with the reranked documents used as context.
+
+        The dense and BM25 legs run concurrently, reranking runs in an executor
+        and the LLM call goes through Ollama's async client, so the event loop
+        is never blocked.
+        """
+        with stage("query_total"):
+            cached, vector = await self._acached_answer(question)
+            if cached is not MISSING:
+                return cached
+
+            ranked = await self.aretrieve(question, vector)
+            prompt = self.build_prompt(question, ranked)
+
+            # Call Llama 3.1 locally
+            with stage("llm_total"):
+                response = await self.async_llm.chat(model=OLLAMA_MODEL, messages=[{"role": "user", "content": prompt}])
+            result = {"answer": response["message"]["content"], "documents": ranked}
+            self.cache.set_answer(question, result, vector)
+            return result
+
+    async def astream(self, question):
+        """Yield ``("documents", ranked_docs)`` once, then ``("token", text)`` as Ollama generates."""
+        start = time.perf_counter()
+        cached, vector = await self._acached_answer(question)
+        if cached is not MISSING:
+            yield "documents", cached["documents"]
+            yield "token", cached["answer"]
+            observe_stage("query_total", time.perf_counter() - start)
+            return
+
+        ranked = await self.aretrieve(question, vector)
+        yield "documents", ranked
+
+        prompt = self.build_prompt(question, ranked)
+        llm_start = time.perf_counter()
+        stream = await self.async_llm.chat(
+            model=OLLAMA_MODEL, messages=[{"role": "user", "content": prompt}], stream=True
+        )
+        tokens = []
+        async for part in stream:
+            token = part["message"]["content"]
+            if token:
+                if not tokens:
+                    observe_stage("llm_first_token", time.perf_counter() - llm_start)
+                tokens.append(token)
+                yield "token", token
+        observe_stage("llm_total", time.perf_counter() - llm_start)
+        observe_stage("query_total", time.perf_counter() - start)
+        self.cache.set_answer(question, {"answer": "".join(tokens), "documents": ranked}, vector)
+
+    def retrieve(self, question, vector=None):
+        """Hybrid candidates reranked to the top 5, served from the retrieval cache when possible."""
+        ranked = self.cache.get_retrieval(question)
+        if ranked is MISSING:
+            candidates = self.hybrid_retriever.search_with_scores(question, k=15, query_vector=vector)
+            ranked = self.rerank(question, candidates)
+            self.cache.set_retrieval(question, ranked)
+        return ranked
+
+    async def aretrieve(self, question, vector=None):
+        ranked = self.cache.get_retrieval(question)
+        if ranked is not MISSING:
+            return ranked
+
+        loop = asyncio.get_running_loop()
+
+        # 1️⃣ Retrieve candidates (both legs concurrently)
+        candidates = await self.hybrid_retriever.asearch_with_scores(question, k=15, query_vector=vector)
+
+        # 2️⃣ Rerank off the event loop (CPU-bound)
+        ranked = await loop.run_in_executor(None, self.rerank, question, candidates)
+        self.cache.set_retrieval(question, ranked)
+        return ranked
+
+    def rerank(self, question, candidates, top_k=5):
+        """Rerank fused ``(doc, score)`` candidates; the fused scores drive adaptive early exit."""
+        docs = [doc for doc, _ in candidates]
+        fused = [score for _, score in candidates]
+        ranked = self.reranker.rerank(question, docs, top_k=top_k, fused_scores=fused)
+        observe_candidates("reranked", len(ranked))
+        return ranked
+
+    def embed_query(self, question):
+        with stage("embedding"):
+            return self.embeddings.embed_query(question)
+
+    def _cached_answer(self, question):
+        """Exact answer-cache hit, else a semantic hit; also returns the query embedding if one was computed."""
+        cached = self.cache.get_answer(question)
+        if cached is not MISSING or self.cache.semantic is None:
+            return cached, None
+        # Embedded once here and reused by the dense leg on a miss
+        vector = self.embed_query(question)
+        return self.cache.get_semantic(vector), vector
+
+    async def _acached_answer(self, question):
+        cached = self.cache.get_answer(question)
+        if cached is not MISSING or self.cache.semantic is None:
+            return cached, None
+        vector = await asyncio.get_running_loop().run_in_executor(None, self.embed_query, question)
+        return self.cache.get_semantic(vector), vector
 
-        # 2️⃣ Rerank
-        ranked = self.reranker.rerank(question, candidates, top_k=5)
+    def build_prompt(self, question, ranked):
+        with stage("prompt"):
+            return self._build_prompt(question, ranked)
 
-        # 3️⃣ Debug context
+    def _build_prompt(self, question, ranked):
         context = "\n".join([doc.page_content for doc in ranked])
-        print("\n🔍 [DEBUG] Final Context Sent to LLM:\n")
-        for i, doc in enumerate(ranked, 1):
-            print(f"--- Doc {i} ---\n{doc.page_content}\n")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Final context sent to LLM:")
+            for i, doc in enumerate(ranked, 1):
+                logger.debug("--- Doc %d ---\n%s", i, doc.page_content)
 
-        # 4️⃣ Prompt
-        prompt = f"""
+        return f"""
         You are an expert in summarizing IMF reports.
         Use ONLY the following context to extract:
         - Specific numbers (percentages, GDP growth, inflation rates, member counts)
@@ -84,7 +236,3 @@ class RAGPipeline:
 
         Question: {question}
         """
-        
-        # 5️⃣ Call Llama 3.1 locally
-        response = ollama.chat(model="llama3.1:8b", messages=[{"role":"user", "content":prompt}])
-        return response["message"]["content"]
@@ -0,0 +1,53 @@
+# src/metrics.py
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram
+
+# Query-path stages: embedding, dense, bm25, native_hybrid, fusion, rerank, prompt,
+# llm_first_token, llm_total, query_total
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds",
+    "Latency of each query-path stage",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+CANDIDATES = Histogram(
+    "rag_candidates",
+    "Documents returned by each retrieval stage",
+    ["stage"],
+    buckets=(0, 1, 2, 5, 10, 15, 20, 30, 50, 100)
+)
+CACHE_LOOKUPS = Counter("rag_cache_lookups_total", "Query cache lookups", ["tier", "result"])
+RERANK_PAIRS = Counter("rag_rerank_pairs_total", "Cross-encoder (query, doc) pairs", ["outcome"])
+STARTUP_SECONDS = Gauge("rag_startup_seconds", "Time to build and warm up the RAG pipeline at worker start")
+
+# Extra ``fn(stage, seconds)`` callbacks, e.g. a benchmark collecting raw samples for percentiles
+_observers = []
+
+
+def add_observer(fn):
+    _observers.append(fn)
+
+
+def remove_observer(fn):
+    _observers.remove(fn)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block into ``rag_stage_seconds{stage=name}``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
+
+
+def observe_stage(name, seconds):
+    STAGE_SECONDS.labels(name).observe(seconds)
+    for fn in _observers:
+        fn(name, seconds)
+
+
+def observe_candidates(name, count):
+    CANDIDATES.labels(name).observe(count)
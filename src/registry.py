@@ -0,0 +1,81 @@
+# src/registry.py
+"""Process-wide, lazily created models and clients.
+
+Every component asks here instead of constructing its own, so a worker holds
+one embedding model, one cross-encoder and one Qdrant client (its HTTP
+connection pool is shared and thread-safe), created on first use.
+"""
+import threading
+import time
+from src.config import EMBEDDING_MODEL, INFERENCE_BACKEND, QDRANT_URL, RERANK_MODEL
+
+_instances = {}
+_load_seconds = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _get(key, factory):
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+    # One lock per key: loading the cross-encoder doesn't block the Qdrant client
+    with _locks_guard:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        if key not in _instances:
+            start = time.perf_counter()
+            _instances[key] = factory()
+            _load_seconds[key] = time.perf_counter() - start
+        return _instances[key]
+
+
+def sentence_transformer(model_name=EMBEDDING_MODEL, backend=INFERENCE_BACKEND):
+    from src.embeddings.onnx_backend import load_sentence_transformer
+    return _get(("sentence_transformer", model_name, backend),
+                lambda: load_sentence_transformer(model_name, backend=backend))
+
+
+def cross_encoder(model_name=RERANK_MODEL, backend=INFERENCE_BACKEND):
+    from src.embeddings.onnx_backend import load_cross_encoder
+
+    def load():
+        # Only on the first request for this model; later callers share the instance
+        print(f"🧠 Loading Cross-Encoder model: {model_name} ({backend})")
+        return load_cross_encoder(model_name, backend=backend)
+    return _get(("cross_encoder", model_name, backend), load)
+
+
+def embeddings(model_name=EMBEDDING_MODEL, backend=INFERENCE_BACKEND):
+    """LangChain embeddings wrapping the shared SentenceTransformer."""
+    from src.embeddings.encoders import SentenceTransformerEmbeddings
+    return _get(("embeddings", model_name, backend),
+                lambda: SentenceTransformerEmbeddings(model=sentence_transformer(model_name, backend)))
+
+
+def qdrant_client(url=QDRANT_URL):
+    from qdrant_client import QdrantClient
+    return _get(("qdrant_client", url), lambda: QdrantClient(url=url))
+
+
+def load_times():
+    """``{"kind:name": seconds}`` for everything loaded so far."""
+    return {":".join(str(part) for part in key): round(seconds, 3) for key, seconds in _load_seconds.items()}
+
+
+def close():
+    """Close instances that hold connections (the Qdrant clients), then drop everything."""
+    for key, instance in list(_instances.items()):
+        if key[0] == "qdrant_client":
+            try:
+                instance.close()
+            except Exception as e:
+                print(f"⚠️ Could not close {key[0]}: {e}")
+    clear()
+
+
+def clear():
+    """Drop every instance (they are re-created on next use)."""
+    with _locks_guard:
+        _instances.clear()
+        _load_seconds.clear()
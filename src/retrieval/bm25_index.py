@@ -0,0 +1,139 @@
+# src/retrieval/bm25_index.py
+from array import array
+from collections import Counter
+import json
+import os
+import numpy as np
+
+
+def tokenize(text):
+    # Same whitespace tokenization BM25Retriever has always used
+    return text.split()
+
+
+class BM25Index:
+    """Okapi BM25 over compact postings lists.
+
+    Postings are stored CSR-style: for term ``t`` the matching doc ids and term
+    frequencies live in ``doc_ids[indptr[t]:indptr[t + 1]]`` and
+    ``term_freqs[indptr[t]:indptr[t + 1]]``. IDF and the per-document length
+    norm are precomputed, so a query only touches documents that contain one of
+    its terms. Scores match ``rank_bm25.BM25Okapi`` (same k1/b/epsilon defaults).
+    """
+
+    ARRAYS = ("indptr", "doc_ids", "term_freqs", "idf", "doc_norms")
+
+    def __init__(self, vocab, indptr, doc_ids, term_freqs, idf, doc_norms, k1=1.5):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.idf = idf
+        self.doc_norms = doc_norms
+        self.k1 = k1
+
+    @property
+    def num_docs(self):
+        return len(self.doc_norms)
+
+    @classmethod
+    def build(cls, tokenized_corpus, k1=1.5, b=0.75, epsilon=0.25):
+        vocab = {}
+        term_ids = array("i")
+        doc_ids = array("i")
+        term_freqs = array("i")
+        doc_lens = array("i")
+
+        for doc_id, tokens in enumerate(tokenized_corpus):
+            doc_lens.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(doc_id)
+                term_freqs.append(tf)
+
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        doc_lens = np.asarray(doc_lens, dtype=np.float64)
+        num_docs = len(doc_lens)
+
+        # Group postings by term; a stable sort keeps doc ids ascending inside each list
+        order = np.argsort(term_ids, kind="stable")
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        term_freqs = np.asarray(term_freqs, dtype=np.float32)[order]
+
+        df = np.bincount(term_ids, minlength=len(vocab))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=indptr[1:])
+
+        # IDF exactly as BM25Okapi: negative values are floored to epsilon * mean idf
+        idf = np.log(num_docs - df + 0.5) - np.log(df + 0.5)
+        if len(idf):
+            idf[idf < 0] = epsilon * idf.mean()
+
+        avgdl = doc_lens.mean() if num_docs else 0.0
+        doc_norms = k1 * (1 - b + b * doc_lens / avgdl) if avgdl else np.full(num_docs, k1)
+
+        return cls(
+            vocab,
+            indptr,
+            doc_ids,
+            term_freqs,
+            idf.astype(np.float32),
+            doc_norms.astype(np.float32),
+            k1=k1,
+        )
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        # Terms in id order; the dict is rebuilt on load
+        terms = sorted(self.vocab, key=self.vocab.get)
+        with open(os.path.join(path, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path, k1=1.5, mmap=True):
+        """Load a saved index; with ``mmap`` the postings stay on disk and are paged in on demand."""
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in cls.ARRAYS
+        }
+        with open(os.path.join(path, "vocab.json"), "r", encoding="utf-8") as f:
+            vocab = {term: i for i, term in enumerate(json.load(f))}
+        return cls(vocab, k1=k1, **arrays)
+
+    def top_k(self, query_tokens, k=10):
+        """Return ``(doc_ids, scores)`` of the best ``k`` documents, best first.
+
+        Only documents that contain at least one query term are returned, so the
+        result can be shorter than ``k``.
+        """
+        id_parts, score_parts = [], []
+        for term, qtf in Counter(query_tokens).items():
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end]
+            weight = qtf * float(self.idf[term_id]) * (self.k1 + 1)
+            id_parts.append(docs)
+            score_parts.append(weight * tf / (tf + self.doc_norms[docs]))
+
+        if not id_parts or k <= 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+
+        if len(id_parts) == 1:
+            candidates = id_parts[0]
+            scores = score_parts[0].astype(np.float64)
+        else:
+            candidates, inverse = np.unique(np.concatenate(id_parts), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+
+        # Partial selection first, then order just the k winners
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return candidates[top], scores[top]
@@ -1,51 +1,116 @@
-from rank_bm25 import BM25Okapi
-from qdrant_client import QdrantClient
+import threading
 from langchain.schema import Document 
+from src.config import BM25_INDEX_DIR
+from src.retrieval.bm25_index import BM25Index, tokenize
+from src.retrieval.bm25_snapshot import load_snapshot, save_snapshot
+from src.vectorstore.qdrant_setup import get_qdrant_client, point_text, read_collection_version, scroll_points
 
 class BM25Retriever:
-    def __init__(self, docs, collection_name="rag_collection"):
-        self.client = QdrantClient(host="localhost", port=6333)
+    def __init__(self, docs=None, collection_name="rag_collection", client=None, index_dir=BM25_INDEX_DIR, metadatas=None):
         self.collection_name = collection_name
-        
-        # If no docs were passed, load them from Qdrant
-        if not docs:
-            self.docs = []
-            offset = None
-            while True:
-                points, next_offset = self.client.scroll(
-                    collection_name=self.collection_name,
-                    limit=100,
-                    offset=offset
-                )
-                if not points:
-                    break
-                for point in points:
-                    if "text" in point.payload and point.payload["text"].strip():
-                        self.docs.append(point.payload["text"])
-                    elif "page_content" in point.payload and point.payload["page_content"].strip():
-                        self.docs.append(point.payload["page_content"])
-                if next_offset is None:
-                    break
-                offset = next_offset
-        else:
-            self.docs = [d for d in docs if d.strip()]
+        self.index_dir = index_dir
+        self._client = client
+        # (index, texts, metadatas), swapped as one object so searches never mix two builds
+        self._state = (None, [], None)
+        # Collection version the loaded index was built for
+        self.version = None
+        self._load_lock = threading.RLock()
 
-        # Initialize BM25
-        if self.docs:
-            tokenized_corpus = [doc.split() for doc in self.docs]
-            self.bm25 = BM25Okapi(tokenized_corpus)
+        self._in_memory = bool(docs)
+        if docs:
+            # ``metadatas`` (one dict per doc, e.g. with the Qdrant ``_id``) lets fusion join these hits on point id
+            kept = [i for i, d in enumerate(docs) if d.strip()]
+            metadatas = [metadatas[i] for i in kept] if metadatas is not None else None
+            docs = [docs[i] for i in kept]
+            self._state = (self._build_in_memory(docs), docs, metadatas)
+            self._loaded = True
         else:
-            print("⚠️ Warning: BM25 corpus is empty.")
-            self.bm25 = None
+            # Loaded from the on-disk snapshot (or Qdrant) on first search
+            self._loaded = False
+
+    @property
+    def bm25(self):
+        return self._state[0]
+
+    @property
+    def docs(self):
+        return self._state[1]
+
+    @property
+    def metadatas(self):
+        return self._state[2]
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_qdrant_client()
+        return self._client
+
+    @staticmethod
+    def _build_in_memory(docs):
+        if docs:
+            return BM25Index.build(tokenize(doc) for doc in docs)
+        print("⚠️ Warning: BM25 corpus is empty.")
+        return None
+
+    def load(self):
+        """Memory-map the build snapshot if it matches the collection version, else rebuild from Qdrant."""
+        # One loader at a time: concurrent first searches would otherwise both scroll and write a snapshot
+        with self._load_lock:
+            version = read_collection_version(self.client, self.collection_name)
+            snapshot = load_snapshot(self.index_dir, self.collection_name)
+
+            if snapshot is not None and version is not None and snapshot[0]["collection_version"] == version:
+                _, bm25, docs, metadatas = snapshot
+                print(f"📂 Loaded BM25 snapshot for '{self.collection_name}' ({len(docs)} docs)")
+                self._state = (bm25, docs, metadatas)
+            else:
+                self._state = self._load_from_qdrant(version)
+            self.version = version
+            self._loaded = True
+
+    def invalidate(self, version=None):
+        """Reload on the next search unless the index already matches ``version`` (called on a version change)."""
+        if not self._in_memory and (version is None or version != self.version):
+            self._loaded = False
+
+    def _load_from_qdrant(self, version):
+        print(f"📡 BM25 snapshot missing or stale, scrolling '{self.collection_name}'...")
+        docs, metadatas = [], []
+        for point in scroll_points(self.client, self.collection_name):
+            text = point_text(point.payload)
+            if text:
+                docs.append(text)
+                source = point.payload.get("source", "")
+                metadatas.append({"_id": point.id, "source": source, "sources": point.payload.get("sources", [source])})
+
+        bm25 = None
+        if version is not None and docs:
+            # Refresh the snapshot so the next worker can skip the scroll
+            try:
+                bm25 = save_snapshot(self.index_dir, self.collection_name, version, docs, metadatas)
+            except OSError as e:
+                print(f"⚠️ Could not write BM25 snapshot: {e}")
+        if bm25 is None:
+            bm25 = self._build_in_memory(docs)
+        print(f"📡 Finished loading BM25 docs. Total: {len(docs)}")
+        return bm25, docs, metadatas
 
     def search(self, query, k=10):
-        if self.bm25 is None:
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.load()
+        bm25, docs, metadatas = self._state
+        if bm25 is None:
             print("⚠️ BM25 is not initialized.")
             return []
 
-        tokenized_query = query.split()
-        scores = self.bm25.get_scores(tokenized_query)
-        top_k_idx = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
-        
+        # Only documents sharing a term with the query are scored
+        top_k_idx, scores = bm25.top_k(tokenize(query), k=k)
+
         # Return Document + score pairs
-        return [(Document(page_content=self.docs[i], metadata={}), scores[i]) for i in top_k_idx]
+        return [
+            (Document(page_content=docs[i], metadata=metadatas[i] if metadatas is not None else {}), float(score))
+            for i, score in zip(top_k_idx, scores)
+        ]
@@ -0,0 +1,148 @@
+# src/retrieval/bm25_snapshot.py
+from array import array
+import json
+import os
+import shutil
+import uuid
+import numpy as np
+from src.retrieval.bm25_index import BM25Index, tokenize
+
+SNAPSHOT_FORMAT = 1
+
+
+class StringStore:
+    """Read-only list of strings backed by one UTF-8 blob plus an offsets array.
+
+    Both files are memory-mapped; a string is decoded only when it is accessed.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+    @classmethod
+    def open(cls, path, name):
+        offsets = np.load(os.path.join(path, f"{name}_offsets.npy"), mmap_mode="r")
+        blob_path = os.path.join(path, f"{name}.bin")
+        # np.memmap refuses zero-length files
+        blob = np.memmap(blob_path, dtype=np.uint8, mode="r") if os.path.getsize(blob_path) else b""
+        return cls(blob, offsets)
+
+
+class JSONStore(StringStore):
+    """StringStore of JSON-encoded values."""
+
+    def __getitem__(self, i):
+        return json.loads(super().__getitem__(i))
+
+
+class StoreWriter:
+    """Append-only writer for the blob + offsets files read by StringStore."""
+
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        self.offsets = array("q", [0])
+        self.file = open(os.path.join(path, f"{name}.bin"), "wb")
+
+    def add(self, s):
+        data = s.encode("utf-8")
+        self.file.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+
+    def close(self):
+        self.file.close()
+        np.save(os.path.join(self.path, f"{self.name}_offsets.npy"), np.asarray(self.offsets, dtype=np.int64))
+
+
+def snapshot_path(index_dir, collection_name):
+    return os.path.join(index_dir, collection_name, "bm25")
+
+
+class SnapshotWriter:
+    """Stream ``(text, metadata)`` records into a new snapshot, then publish it atomically.
+
+    Texts go straight to disk as they arrive, so a build never needs the whole
+    corpus in memory; the index is built afterwards from the memory-mapped texts.
+    ``metadata`` is one dict per text (point id, source) returned with search hits.
+    """
+
+    def __init__(self, index_dir, collection_name):
+        self.collection_name = collection_name
+        self.path = snapshot_path(index_dir, collection_name)
+        # Unique per writer: threads of one process may build snapshots concurrently
+        self.tmp_path = f"{self.path}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(self.tmp_path)
+        self.texts = StoreWriter(self.tmp_path, "texts")
+        self.metadata = StoreWriter(self.tmp_path, "metadata")
+
+    def add(self, text, metadata):
+        self.texts.add(text)
+        self.metadata.add(json.dumps(metadata, ensure_ascii=False))
+
+    def commit(self, version, k1=1.5, b=0.75):
+        self.texts.close()
+        self.metadata.close()
+
+        texts = StringStore.open(self.tmp_path, "texts")
+        index = BM25Index.build((tokenize(texts[i]) for i in range(len(texts))), k1=k1, b=b)
+        index.save(self.tmp_path)
+
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "collection": self.collection_name,
+            "collection_version": version,
+            "num_docs": index.num_docs,
+            "k1": k1,
+            "b": b,
+        }
+        with open(os.path.join(self.tmp_path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Swap the finished snapshot into place so readers never see a partial one
+        old_path = f"{self.path}.old-{uuid.uuid4().hex}"
+        if os.path.exists(self.path):
+            os.replace(self.path, old_path)
+        os.replace(self.tmp_path, self.path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        return index
+
+    def abort(self):
+        self.texts.file.close()
+        self.metadata.file.close()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+
+def save_snapshot(index_dir, collection_name, version, texts, metadatas, k1=1.5, b=0.75):
+    """Build and publish a snapshot from in-memory ``texts`` and matching ``metadatas``."""
+    writer = SnapshotWriter(index_dir, collection_name)
+    for text, metadata in zip(texts, metadatas):
+        writer.add(text, metadata)
+    return writer.commit(version, k1=k1, b=b)
+
+
+def read_manifest(index_dir, collection_name):
+    manifest_file = os.path.join(snapshot_path(index_dir, collection_name), "manifest.json")
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == SNAPSHOT_FORMAT else None
+
+
+def load_snapshot(index_dir, collection_name):
+    """Memory-map a snapshot. Returns ``(manifest, index, texts, metadatas)`` or None."""
+    manifest = read_manifest(index_dir, collection_name)
+    if manifest is None:
+        return None
+    path = snapshot_path(index_dir, collection_name)
+    index = BM25Index.load(path, k1=manifest["k1"], mmap=True)
+    return manifest, index, StringStore.open(path, "texts"), JSONStore.open(path, "metadata")
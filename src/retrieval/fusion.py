@@ -0,0 +1,81 @@
+# src/retrieval/fusion.py
+import numpy as np
+
+FUSION_MODES = ("weighted", "rrf", "convex")
+
+
+def top_k_indices(scores, k):
+    """Indices of the ``k`` highest scores, best first, without sorting the whole array."""
+    scores = np.asarray(scores)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def doc_key(doc, by_id=True):
+    """Qdrant point id (``by_id``), else the text."""
+    return str(doc.metadata["_id"]) if by_id else doc.page_content
+
+
+def fuse(legs, k=10, mode="weighted", weights=None, lower_bounds=None, rrf_k=60):
+    """Fuse ranked ``[(doc, score), ...]`` lists from several retrievers into the top ``k``.
+
+    Results are joined on point id and the first Document seen for an id is
+    kept, metadata included. If any hit has no id (e.g. an in-memory BM25
+    corpus), every leg is joined on text instead, so the legs still match. Scores for each leg go into one column of a
+    ``(n_docs, n_legs)`` array; a document missing from a leg contributes 0.
+
+    - ``weighted``: min-max normalize each leg over its own hits, weighted sum
+    - ``convex``: normalize each leg between its theoretical minimum
+      (``lower_bounds``, e.g. -1 for cosine, 0 for BM25) and its best hit, weighted sum
+    - ``rrf``: weighted reciprocal rank fusion, ``w / (rrf_k + rank)``, scaled by its maximum
+
+    With weights summing to 1, fused scores are in [0, 1]. Returns ``[(doc, score), ...]`` best first.
+    """
+    if mode not in FUSION_MODES:
+        raise ValueError(f"Unknown fusion mode '{mode}', expected one of {FUSION_MODES}")
+    n_legs = len(legs)
+    weights = np.asarray(weights if weights is not None else [1.0 / n_legs] * n_legs, dtype=np.float64)
+
+    # Join on id (or text, unless every hit has an id): row per unique document, in first-seen order
+    by_id = all(doc.metadata.get("_id") is not None for results in legs for doc, _ in results)
+    rows, docs = {}, []
+    leg_rows, leg_scores = [], []
+    for results in legs:
+        idx = np.empty(len(results), dtype=np.intp)
+        for i, (doc, _) in enumerate(results):
+            key = doc_key(doc, by_id)
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = len(docs)
+                docs.append(doc)
+            idx[i] = row
+        leg_rows.append(idx)
+        leg_scores.append(np.fromiter((score for _, score in results), dtype=np.float64, count=len(results)))
+
+    if not docs:
+        return []
+
+    matrix = np.zeros((len(docs), n_legs))
+    for j, (idx, scores) in enumerate(zip(leg_rows, leg_scores)):
+        if len(scores) == 0:
+            continue
+        if mode == "rrf":
+            # Legs arrive best first; a duplicate id within a leg keeps its best rank
+            ranks = np.arange(1, len(scores) + 1, dtype=np.float64)
+            np.maximum.at(matrix[:, j], idx, 1.0 / (rrf_k + ranks))
+            continue
+        low = scores.min() if mode == "weighted" else (lower_bounds[j] if lower_bounds is not None else 0.0)
+        span = scores.max() - low
+        normalized = (scores - low) / span if span > 0 else np.ones_like(scores)
+        np.maximum.at(matrix[:, j], idx, np.clip(normalized, 0.0, 1.0))
+
+    fused = matrix @ weights
+    if mode == "rrf":
+        fused /= weights.sum() / (rrf_k + 1)
+
+    top = top_k_indices(fused, k)
+    return [(docs[i], float(fused[i])) for i in top]
@@ -1,47 +1,100 @@
 from langchain.schema import Document
-import numpy as np
+import asyncio
+import logging
+from src.config import FUSION_MODE, FUSION_DENSE_K, FUSION_BM25_K, RRF_K, COLLECTION_PROFILE, SEARCH_HNSW_EF
+from src.metrics import stage, observe_candidates
+from src.retrieval.fusion import fuse
+from src.vectorstore.profiles import search_params
+from src.vectorstore.qdrant_setup import point_text
+
+logger = logging.getLogger(__name__)
+
+# Theoretical minimum score per leg, used by convex fusion: cosine similarity, BM25
+LOWER_BOUNDS = (-1.0, 0.0)
 
 class HybridRetriever:
-    def __init__(self, qdrant_store, bm25_retriever, faiss_weight=0.7, bm25_weight=0.3):
+    def __init__(self, qdrant_store, bm25_retriever, faiss_weight=0.7, bm25_weight=0.3,
+                 mode=FUSION_MODE, dense_k=FUSION_DENSE_K, bm25_k=FUSION_BM25_K, rrf_k=RRF_K,
+                 profile=COLLECTION_PROFILE, hnsw_ef=SEARCH_HNSW_EF):
         self.qdrant_store = qdrant_store
         self.bm25_retriever = bm25_retriever
         self.faiss_weight = faiss_weight
         self.bm25_weight = bm25_weight
+        self.mode = mode
+        # Candidate depth per leg; 0/None means the requested k
+        self.dense_k = dense_k
+        self.bm25_k = bm25_k
+        self.rrf_k = rrf_k
+        # hnsw_ef and quantized oversampling/rescoring matching the collection profile
+        self.search_params = search_params(profile, hnsw_ef)
+
+    def search(self, query, k=10, query_vector=None):
+        return [doc for doc, _ in self.search_with_scores(query, k, query_vector)]
 
-    def search(self, query, k=10):
-        # --- Semantic (FAISS/Qdrant) Search ---
-        faiss_results = self.qdrant_store.similarity_search_with_score(query, k=k)
+    def search_with_scores(self, query, k=10, query_vector=None):
+        """Fused ``(doc, score)`` pairs, best first; scores are in [0, 1]."""
+        # --- Semantic (Qdrant) Search ---
+        faiss_results = self.dense_search(query, self.dense_k or k, query_vector)
         
         # --- BM25 Search ---
-        bm25_results = self.bm25_retriever.search(query, k=k)
-
-        # --- Normalize scores ---
-        faiss_scores = np.array([score for _, score in faiss_results])
-        bm25_scores = np.array([score for _, score in bm25_results])
-
-        if len(faiss_scores) > 0:
-            faiss_scores = (faiss_scores - faiss_scores.min()) / (faiss_scores.max() - faiss_scores.min() + 1e-9)
-        if len(bm25_scores) > 0:
-            bm25_scores = (bm25_scores - bm25_scores.min()) / (bm25_scores.max() - bm25_scores.min() + 1e-9)
-
-        # --- Combine results ---
-        combined_docs = {}
-        for i, (doc, score) in enumerate(faiss_results):
-            combined_docs[doc.page_content] = self.faiss_weight * faiss_scores[i]
-
-        for i, (doc, score) in enumerate(bm25_results):
-            if doc.page_content in combined_docs:
-                combined_docs[doc.page_content] += self.bm25_weight * bm25_scores[i]
-            else:
-                combined_docs[doc.page_content] = self.bm25_weight * bm25_scores[i]
-
-        # --- Sort by combined score ---
-        ranked_results = sorted(combined_docs.items(), key=lambda x: x[1], reverse=True)[:k]
-        ranked_docs = [Document(page_content=doc, metadata={}) for doc, _ in ranked_results]
-
-        # --- Debug log ---
-        print("\n📊 [DEBUG] Hybrid Scores (FAISS + BM25 fusion):")
-        for doc, score in ranked_results:
-            print(f"Score: {score:.4f} | Content: {doc[:80]}...")
-
-        return ranked_docs
+        bm25_results = self.lexical_search(query, self.bm25_k or k)
+
+        return self.fuse(faiss_results, bm25_results, k)
+
+    async def asearch(self, query, k=10, query_vector=None):
+        return [doc for doc, _ in await self.asearch_with_scores(query, k, query_vector)]
+
+    async def asearch_with_scores(self, query, k=10, query_vector=None):
+        """Same as ``search_with_scores`` but the dense and BM25 legs run concurrently in the default executor."""
+        loop = asyncio.get_running_loop()
+        faiss_results, bm25_results = await asyncio.gather(
+            loop.run_in_executor(None, self.dense_search, query, self.dense_k or k, query_vector),
+            loop.run_in_executor(None, self.lexical_search, query, self.bm25_k or k),
+        )
+        return self.fuse(faiss_results, bm25_results, k)
+
+    def dense_search(self, query, k, query_vector=None):
+        """Nearest points as ``(Document, cosine)`` with the same ``_id``/``source`` metadata as the BM25 leg."""
+        # Reuse an embedding the caller already computed (e.g. for the semantic cache)
+        if query_vector is None:
+            with stage("embedding"):
+                query_vector = self.qdrant_store.embeddings.embed_query(query)
+        with stage("dense"):
+            points = self.qdrant_store.client.query_points(
+                collection_name=self.qdrant_store.collection_name,
+                query=list(query_vector),
+                limit=k,
+                search_params=self.search_params,
+                with_payload=True
+            ).points
+        observe_candidates("dense", len(points))
+        return [
+            (Document(page_content=point_text(p.payload), metadata={"_id": p.id, "source": (p.payload or {}).get("source", "")}), p.score)
+            for p in points
+        ]
+
+    def lexical_search(self, query, k):
+        with stage("bm25"):
+            results = self.bm25_retriever.search(query, k=k)
+        observe_candidates("bm25", len(results))
+        return results
+
+    def fuse(self, faiss_results, bm25_results, k=10):
+        with stage("fusion"):
+            ranked = fuse(
+                [faiss_results, bm25_results],
+                k=k,
+                mode=self.mode,
+                weights=[self.faiss_weight, self.bm25_weight],
+                lower_bounds=LOWER_BOUNDS,
+                rrf_k=self.rrf_k
+            )
+        observe_candidates("fused", len(ranked))
+
+        # --- Debug log (previews are only formatted when DEBUG is on) ---
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Hybrid scores (%s fusion, dense + BM25):", self.mode)
+            for doc, score in ranked:
+                logger.debug("Score: %.4f | Content: %s...", score, doc.page_content[:80])
+
+        return ranked
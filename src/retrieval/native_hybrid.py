@@ -0,0 +1,71 @@
+# src/retrieval/native_hybrid.py
+import asyncio
+import numpy as np
+from langchain.schema import Document
+from qdrant_client.models import Fusion, FusionQuery, Prefetch
+from src.config import FUSION_DENSE_K, FUSION_BM25_K, COLLECTION_PROFILE, SEARCH_HNSW_EF
+from src.metrics import stage, observe_candidates
+from src.retrieval.sparse_encoder import SPARSE_VECTOR_NAME, sparse_query_vector
+from src.vectorstore.profiles import search_params
+from src.vectorstore.qdrant_setup import point_text
+
+
+class NativeHybridRetriever:
+    """Dense + sparse BM25 retrieval fused by Qdrant in a single ``query_points`` call.
+
+    Needs a collection built with the ``bm25`` sparse vector (see
+    ``create_collection``). Nothing but the query embedding model lives in the
+    worker, so API workers don't hold a copy of the corpus. Works against a
+    server or ``QdrantClient(":memory:")``.
+    """
+
+    def __init__(self, client, collection_name, embeddings, dense_k=FUSION_DENSE_K, sparse_k=FUSION_BM25_K,
+                 profile=COLLECTION_PROFILE, hnsw_ef=SEARCH_HNSW_EF):
+        self.client = client
+        self.collection_name = collection_name
+        self.embeddings = embeddings
+        # Candidates per leg before fusion; 0/None means the requested k
+        self.dense_k = dense_k
+        self.sparse_k = sparse_k
+        # Applies to the dense prefetch: hnsw_ef and quantized oversampling/rescoring
+        self.search_params = search_params(profile, hnsw_ef)
+
+    def search(self, query, k=10, query_vector=None):
+        return [doc for doc, _ in self.search_with_scores(query, k, query_vector)]
+
+    def search_with_scores(self, query, k=10, query_vector=None):
+        """RRF-fused ``(doc, score)`` pairs, best first; scores are scaled so the best is 1."""
+        if query_vector is None:
+            with stage("embedding"):
+                query_vector = self.embeddings.embed_query(query)
+
+        prefetch = [Prefetch(query=list(query_vector), params=self.search_params, limit=self.dense_k or k)]
+        sparse = sparse_query_vector(query)
+        if sparse.indices:
+            prefetch.append(Prefetch(query=sparse, using=SPARSE_VECTOR_NAME, limit=self.sparse_k or k))
+
+        with stage("native_hybrid"):
+            points = self.client.query_points(
+                collection_name=self.collection_name,
+                prefetch=prefetch,
+                query=FusionQuery(fusion=Fusion.RRF),
+                limit=k,
+                with_payload=True
+            ).points
+        observe_candidates("fused", len(points))
+        if not points:
+            return []
+
+        # RRF scores are tiny and depend on the rank constant; rescale to [0, 1] for the reranker
+        scores = np.array([p.score for p in points], dtype=np.float64)
+        scores /= scores.max() if scores.max() > 0 else 1.0
+        return [
+            (Document(page_content=point_text(p.payload), metadata={"_id": p.id, "source": (p.payload or {}).get("source", "")}), float(s))
+            for p, s in zip(points, scores)
+        ]
+
+    async def asearch(self, query, k=10, query_vector=None):
+        return [doc for doc, _ in await self.asearch_with_scores(query, k, query_vector)]
+
+    async def asearch_with_scores(self, query, k=10, query_vector=None):
+        return await asyncio.get_running_loop().run_in_executor(None, self.search_with_scores, query, k, query_vector)
@@ -0,0 +1,89 @@
+# src/retrieval/rerank_batcher.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+
+class RerankBatcher:
+    """Coalesces (query, doc) pairs from concurrent callers into one ``predict`` call.
+
+    A background thread takes the first pending request, then keeps collecting
+    requests for up to ``max_wait_ms`` or until ``max_batch_size`` pairs are
+    queued, runs a single batched forward pass and routes each slice of scores
+    back to its caller's future.
+    """
+
+    def __init__(self, predict, max_batch_size=128, max_wait_ms=5):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._requests = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self.pairs = 0
+        self._thread = threading.Thread(target=self._run, name="rerank-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, pairs):
+        """Queue pairs for scoring; returns a Future resolving to a NumPy array of scores."""
+        future = Future()
+        if not pairs:
+            future.set_result(np.empty(0, dtype=np.float32))
+        elif self._closed:
+            future.set_exception(RuntimeError("RerankBatcher is closed"))
+        else:
+            self._requests.put((list(pairs), future))
+        return future
+
+    def score(self, pairs):
+        return self.submit(pairs).result()
+
+    def _collect(self):
+        first = self._requests.get()
+        if first is None:
+            return None
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Finish this batch, then stop on the next loop
+                self._requests.put(None)
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            pairs = [pair for pairs, _ in batch for pair in pairs]
+            try:
+                scores = np.asarray(self.predict(pairs))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.pairs += len(pairs)
+            offset = 0
+            for request_pairs, future in batch:
+                future.set_result(scores[offset:offset + len(request_pairs)])
+                offset += len(request_pairs)
+
+    def close(self):
+        self._closed = True
+        self._requests.put(None)
+        self._thread.join()
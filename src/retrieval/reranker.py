@@ -1,36 +1,126 @@
 # src/retrieval/reranker.py
-from sentence_transformers import CrossEncoder
+import logging
 import numpy as np
+from src.config import (
+    RERANK_BATCHING, RERANK_MAX_BATCH, RERANK_BATCH_WAIT_MS, INFERENCE_BACKEND,
+    RERANK_MODE, RERANK_ALPHA, RERANK_CASCADE_BATCH, RERANK_MODEL
+)
+from src import registry
+from src.metrics import stage, RERANK_PAIRS
+from src.retrieval.fusion import top_k_indices
+from src.retrieval.rerank_batcher import RerankBatcher
+
+logger = logging.getLogger(__name__)
+
+RERANK_MODES = ("full", "adaptive")
 
 class Reranker:
-    def __init__(self, model_name="cross-encoder/ms-marco-MiniLM-L-6-v2"):
-        print(f"🧠 Loading Cross-Encoder model: {model_name}")
-        self.model = CrossEncoder(model_name)
+    def __init__(self, model_name=RERANK_MODEL, batching=RERANK_BATCHING,
+                 max_batch_size=RERANK_MAX_BATCH, max_wait_ms=RERANK_BATCH_WAIT_MS, backend=INFERENCE_BACKEND,
+                 mode=RERANK_MODE, alpha=RERANK_ALPHA, batch_size=RERANK_CASCADE_BATCH, model=None):
+        if model is None:
+            model = registry.cross_encoder(model_name, backend)
+        # Anything with CrossEncoder.predict(pairs, batch_size=...) works
+        self.model = model
+
+        # "full" scores every candidate; "adaptive" cascades by fused score and exits early
+        if mode not in RERANK_MODES:
+            raise ValueError(f"Unknown rerank mode '{mode}', expected one of {RERANK_MODES}")
+        self.mode = mode
+        self.alpha = alpha
+        self.batch_size = batch_size
+        self.pairs_scored = 0
+        self.pairs_skipped = 0
+
+        # Coalesce pairs from concurrent requests into one forward pass
+        self.batcher = None
+        if batching:
+            self.batcher = RerankBatcher(
+                lambda pairs: self.model.predict(pairs, batch_size=max_batch_size),
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms
+            )
+
+    def score_pairs(self, pairs):
+        if self.batcher is not None:
+            return self.batcher.score(pairs)
+        return self.model.predict(pairs)
+
+    def rerank(self, query, docs, top_k=5, fused_scores=None):
+        """Top ``top_k`` docs by cross-encoder relevance.
 
-    def rerank(self, query, docs, top_k=5):
+        With ``fused_scores`` (the hybrid scores in [0, 1]) and ``mode="adaptive"``,
+        candidates are scored in fused-score order and the cascade stops early;
+        see ``_rerank_adaptive``.
+        """
         if not docs:
-            print("⚠️ No documents to rerank.")
+            logger.warning("No documents to rerank.")
             return []
 
-        # Prepare (query, doc) pairs
+        with stage("rerank"):
+            if self.mode == "adaptive" and fused_scores is not None:
+                return self._rerank_adaptive(query, docs, np.asarray(fused_scores, dtype=np.float64), top_k)
+            return self._rerank_full(query, docs, top_k)
+
+    def _rerank_full(self, query, docs, top_k):
+        # Prepare (query, doc) pairs and predict relevance scores
         pairs = [(query, doc.page_content) for doc in docs]
+        scores = np.asarray(self.score_pairs(pairs), dtype=np.float64)
+        self.pairs_scored += len(pairs)
+        RERANK_PAIRS.labels("scored").inc(len(pairs))
+
+        # Normalize to 0–1 (all-equal scores normalize to 0 instead of dividing by zero)
+        span = scores.max() - scores.min()
+        norm_scores = (scores - scores.min()) / span if span > 0 else np.zeros_like(scores)
+
+        top = top_k_indices(norm_scores, top_k)
+        self._log(docs, norm_scores, top)
+        return [docs[i] for i in top]
+
+    def _rerank_adaptive(self, query, docs, fused, top_k):
+        """Cascade over candidates in fused-score order.
+
+        Final score is ``alpha * fused + (1 - alpha) * sigmoid(ce)``. Every
+        round scores the next ``batch_size`` candidates; an unscored candidate
+        can reach at most ``alpha * fused + (1 - alpha)``, so once the best
+        remaining bound is below the current k-th final score, the rest are skipped.
+        """
+        order = np.argsort(-fused, kind="stable")
+        final = np.full(len(docs), -np.inf)
+        batch_size = max(self.batch_size or top_k, 1)
+        scored = 0
+        while scored < len(order):
+            batch = order[scored:scored + batch_size]
+            ce = np.asarray(self.score_pairs([(query, docs[i].page_content) for i in batch]), dtype=np.float64)
+            final[batch] = self.alpha * fused[batch] + (1 - self.alpha) * _sigmoid(ce)
+            scored += len(batch)
+
+            if scored >= top_k and scored < len(order):
+                kth = np.partition(final, -top_k)[-top_k]
+                bound = self.alpha * fused[order[scored]] + (1 - self.alpha)
+                if bound <= kth:
+                    break
 
-        # Predict relevance scores
-        scores = self.model.predict(pairs)
+        skipped = len(docs) - scored
+        self.pairs_scored += scored
+        self.pairs_skipped += skipped
+        RERANK_PAIRS.labels("scored").inc(scored)
+        RERANK_PAIRS.labels("skipped").inc(skipped)
+        if skipped:
+            logger.debug("Adaptive rerank scored %d/%d pairs, skipped %d", scored, len(docs), skipped)
 
-        # Normalize to 0–1
-        norm_scores = (scores - np.min(scores)) / (np.max(scores) - np.min(scores))
-        scored_docs = list(zip(docs, norm_scores))
+        top = top_k_indices(final, top_k)
+        self._log(docs, final, top)
+        return [docs[i] for i in top]
 
-        # Combine docs with scores
-        scored_docs = list(zip(docs, norm_scores))
+    def _log(self, docs, scores, top):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        logger.debug("Reranker scores:")
+        for rank, i in enumerate(top, 1):
+            logger.debug("Rank %d | Score: %.4f | Content: %s...", rank, scores[i], docs[i].page_content[:100])
 
-        # Sort by score (descending)
-        reranked = sorted(scored_docs, key=lambda x: x[1], reverse=True)
 
-        print("\n📊 [DEBUG] Reranker Scores:")
-        for rank, (doc, score) in enumerate(reranked[:top_k], 1):
-            print(f"Rank {rank} | Score: {score:.4f} | Content: {doc.page_content[:100]}...")
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
 
-        # Return top_k docs
-        return [doc for doc, score in reranked[:top_k]]
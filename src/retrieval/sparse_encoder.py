@@ -0,0 +1,41 @@
+# src/retrieval/sparse_encoder.py
+import zlib
+from collections import Counter
+from qdrant_client.models import SparseVector
+from src.config import SPARSE_AVG_DOC_LEN
+from src.retrieval.bm25_index import tokenize
+
+# Named sparse vector holding BM25 term weights on each point
+SPARSE_VECTOR_NAME = "bm25"
+
+
+def term_id(token):
+    """Stable 32-bit term id, so no vocabulary has to be shared between build and query workers."""
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def _term_counts(text):
+    counts = Counter()
+    for token, tf in Counter(tokenize(text)).items():
+        # Hash collisions just merge the two terms' counts
+        counts[term_id(token)] += tf
+    return counts
+
+
+def sparse_doc_vector(text, k1=1.5, b=0.75, avg_doc_len=SPARSE_AVG_DOC_LEN):
+    """BM25 term-frequency part of a document; Qdrant applies IDF at query time (``Modifier.IDF``).
+
+    The length normalization uses a fixed ``avg_doc_len`` (tokens) so a point's
+    vector does not depend on the rest of the corpus and streams with the build.
+    """
+    counts = _term_counts(text)
+    doc_len = sum(counts.values())
+    norm = k1 * (1 - b + b * doc_len / avg_doc_len)
+    indices = sorted(counts)
+    return SparseVector(indices=indices, values=[counts[i] * (k1 + 1) / (counts[i] + norm) for i in indices])
+
+
+def sparse_query_vector(text):
+    """One unit weight per distinct query term."""
+    indices = sorted(_term_counts(text))
+    return SparseVector(indices=indices, values=[1.0] * len(indices))
@@ -0,0 +1,3 @@
+from .jsonl import JsonlWriter, write_records, iter_records, count_records, read_record, is_complete, is_current_run
+
+__all__ = ["JsonlWriter", "write_records", "iter_records", "count_records", "read_record", "is_complete", "is_current_run"]
@@ -0,0 +1,194 @@
+# src/storage/jsonl.py
+"""Newline-delimited JSON records, optionally gzip-compressed, with a sidecar offsets index.
+
+Layout for ``records.jsonl`` (or ``records.jsonl.gz``):
+- ``records.jsonl``      one JSON object per line
+- ``records.jsonl.idx``  little-endian uint64 offset of each record's line
+                         (into the decompressed stream for ``.gz``)
+- ``records.jsonl.run``  written when the producer opens the file: its run id and start time
+- ``records.jsonl.done`` written when the producer closes the file
+
+Writers flush every record, so a reader with ``follow=True`` can consume a
+file while the previous stage is still producing it, and stops at ``.done``.
+A follower only trusts a file whose ``.run`` belongs to the current run
+(same ``run_id``, or started no earlier than ``since``), so a previous run's
+finished file is never mistaken for this one's.
+Legacy ``.json`` array files are still readable.
+"""
+import gzip
+import json
+import os
+import struct
+import time
+import numpy as np
+
+INDEX_SUFFIX = ".idx"
+DONE_SUFFIX = ".done"
+RUN_SUFFIX = ".run"
+
+
+def is_gzip(path):
+    return path.endswith(".gz")
+
+
+def _open(path, mode):
+    if is_gzip(path):
+        return gzip.open(path, mode + "b")
+    return open(path, mode + "b")
+
+
+class JsonlWriter:
+    """Append records one at a time; use as a context manager so ``.done`` is written on success.
+
+    Open it when the stage starts, before any slow work, so followers see the
+    new run (and no stale ``.done``) right away.
+    """
+
+    def __init__(self, path, index=True, run_id=None):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        for suffix in (DONE_SUFFIX, INDEX_SUFFIX, RUN_SUFFIX):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        self._file = _open(path, "w")
+        # Stamped after the old markers are gone and the data truncated
+        with open(path + RUN_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump({"run_id": run_id, "started": time.time()}, f)
+        self._index = open(path + INDEX_SUFFIX, "wb") if index else None
+        self._offset = 0
+        self.count = 0
+
+    def write(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self._file.write(line)
+        self._file.flush()
+        if self._index is not None:
+            self._index.write(struct.pack("<Q", self._offset))
+            self._index.flush()
+        self._offset += len(line)
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self, complete=True):
+        self._file.close()
+        if self._index is not None:
+            self._index.close()
+        if complete:
+            with open(self.path + DONE_SUFFIX, "w", encoding="utf-8") as f:
+                f.write(str(self.count))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A failed producer leaves no .done, so followers don't mistake a partial file for a finished one
+        self.close(complete=exc_type is None)
+
+
+def write_records(path, records):
+    """Write an iterable of records; returns how many were written."""
+    with JsonlWriter(path) as writer:
+        return writer.write_many(records)
+
+
+def is_complete(path):
+    return os.path.exists(path + DONE_SUFFIX)
+
+
+def read_run(path):
+    """``{"run_id", "started"}`` of the writer that last opened ``path``, or None."""
+    try:
+        with open(path + RUN_SUFFIX, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_current_run(path, run_id=None, since=None):
+    """Whether ``path`` was opened by this run: same ``run_id`` if given, else started at or after ``since``."""
+    run = read_run(path)
+    if run is None or not os.path.exists(path):
+        return False
+    if run_id is not None:
+        return run.get("run_id") == run_id
+    return since is None or run.get("started", 0) >= since
+
+
+def iter_records(path, follow=False, poll_interval=0.5, run_id=None, since=None):
+    """Yield records from ``path`` one at a time.
+
+    With ``follow=True`` the reader waits for the current run's file (see
+    ``is_current_run``) and for new lines until the writer has closed it.
+    Compressed files can't be tailed mid-stream, so for ``.gz`` following
+    means waiting for ``.done`` first.
+    """
+    if path.endswith(".json"):
+        # Legacy single JSON array
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+
+    if follow:
+        waiting = False
+        while not is_current_run(path, run_id, since) or (is_gzip(path) and not is_complete(path)):
+            if not waiting:
+                print(f"⏳ Waiting for this run's {path}...")
+                waiting = True
+            time.sleep(poll_interval)
+
+    if not follow or is_gzip(path):
+        with _open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    with open(path, "rb") as f:
+        pending = b""
+        while True:
+            line = f.readline()
+            if line.endswith(b"\n"):
+                line, pending = pending + line, b""
+                if line.strip():
+                    yield json.loads(line)
+                continue
+            # Partial line (or nothing): the writer is mid-record or idle
+            pending += line
+            if is_complete(path):
+                # Check once more after .done in case the last lines landed just before it
+                rest = pending + f.read()
+                for tail in rest.splitlines():
+                    if tail.strip():
+                        yield json.loads(tail)
+                return
+            time.sleep(poll_interval)
+
+
+def read_offsets(path):
+    """Record offsets from the sidecar index, or None if there is none."""
+    index_path = path + INDEX_SUFFIX
+    if not os.path.exists(index_path):
+        return None
+    return np.fromfile(index_path, dtype="<u8")
+
+
+def count_records(path):
+    """Number of records, from the index when available (no need to read the data)."""
+    offsets = read_offsets(path)
+    if offsets is not None:
+        return len(offsets)
+    return sum(1 for _ in iter_records(path))
+
+
+def read_record(path, i):
+    """Record ``i`` via the offsets index (for ``.gz`` the seek decompresses up to it)."""
+    offsets = read_offsets(path)
+    if offsets is None:
+        raise FileNotFoundError(f"No offsets index for {path}")
+    with _open(path, "r") as f:
+        f.seek(int(offsets[i]))
+        return json.loads(f.readline())
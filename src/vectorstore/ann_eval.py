@@ -0,0 +1,80 @@
+# src/vectorstore/ann_eval.py
+"""Exact brute-force nearest neighbours vs. Qdrant's ANN results: recall@k and latency."""
+import time
+import numpy as np
+
+EXACT_BLOCK = 65536
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _top_columns(scores, k):
+    """Column indices of each row's ``k`` largest scores (unordered)."""
+    if scores.shape[1] <= k:
+        return np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def exact_top_k(vectors, queries, k, block=EXACT_BLOCK):
+    """Row indices of the ``k`` highest-cosine ``vectors`` for each query, best first.
+
+    The corpus is scanned in blocks of ``block`` rows, so the score matrix never
+    exceeds ``len(queries) x block``; each block's top-k is merged into the running one.
+    """
+    queries = normalize(queries)
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+    best_ids = np.empty((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(vectors), block):
+        scores = queries @ normalize(vectors[start:start + block]).T
+        columns = _top_columns(scores, k)
+        merged_scores = np.concatenate([best_scores, np.take_along_axis(scores, columns, axis=1)], axis=1)
+        merged_ids = np.concatenate([best_ids, columns + start], axis=1)
+        keep = _top_columns(merged_scores, k)
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        best_ids = np.take_along_axis(merged_ids, keep, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_ids, order, axis=1)
+
+
+def wait_for_index(client, collection_name, timeout=600, poll_interval=1.0):
+    """Wait until Qdrant has finished optimizing (status green); unindexed segments are searched exactly.
+
+    Returns the indexed vector count.
+    """
+    from qdrant_client.models import CollectionStatus
+    start = time.perf_counter()
+    while client.get_collection(collection_name).status != CollectionStatus.GREEN:
+        if time.perf_counter() - start > timeout:
+            print(f"⚠️ '{collection_name}' still optimizing after {timeout}s; measuring anyway")
+            break
+        time.sleep(poll_interval)
+    return client.get_collection(collection_name).indexed_vectors_count
+
+
+def ann_top_k(client, collection_name, queries, k, search_params=None):
+    """Point ids (as str) returned by Qdrant for each query, and each query's latency in seconds."""
+    results, latencies = [], []
+    for query in np.asarray(queries, dtype=np.float32):
+        start = time.perf_counter()
+        points = client.query_points(
+            collection_name=collection_name,
+            query=query.tolist(),
+            limit=k,
+            search_params=search_params,
+            with_payload=False
+        ).points
+        latencies.append(time.perf_counter() - start)
+        results.append([str(p.id) for p in points])
+    return results, latencies
+
+
+def recall_at_k(exact_ids, ann_ids, k):
+    """Mean fraction of each query's exact top-k that the ANN top-k also returned."""
+    if not len(exact_ids):
+        return 1.0
+    hits = [len(set(exact[:k]) & set(ann[:k])) / max(min(k, len(exact)), 1) for exact, ann in zip(exact_ids, ann_ids)]
+    return float(np.mean(hits))
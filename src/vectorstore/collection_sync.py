@@ -0,0 +1,207 @@
+# src/vectorstore/collection_sync.py
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from qdrant_client.models import (
+    PointIdsList,
+    SetPayload,
+    SetPayloadOperation,
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Modifier,
+    SparseVectorParams,
+)
+from src.config import COLLECTION_PROFILE
+from src.retrieval.sparse_encoder import SPARSE_VECTOR_NAME
+from src.vectorstore.profiles import get_profile
+from src.vectorstore.qdrant_setup import read_collection_meta, scroll_points
+
+SYNC_MODES = ("recreate", "incremental", "shadow")
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def stable_point_id(source, text):
+    """Point id derived from source URL + chunk hash, so it survives chunk reordering."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}#{content_hash(text)}"))
+
+
+def existing_points(client, collection_name):
+    """Map of ``str(id) -> (id, sources)`` for every point.
+
+    Raw ids are kept for deletes of legacy int ids; ``sources`` (None on points
+    written before it existed) lets a rebuild refresh merged duplicate sources.
+    """
+    if not client.collection_exists(collection_name):
+        return {}
+    return {
+        str(p.id): (p.id, (p.payload or {}).get("sources"))
+        for p in scroll_points(client, collection_name, batch_size=1000, with_payload=["sources"])
+    }
+
+
+def set_sources(client, collection_name, updates, batch_size=256):
+    """Overwrite the ``sources`` payload of existing points from ``[(id, sources), ...]``, without re-uploading them."""
+    for i in range(0, len(updates), batch_size):
+        client.batch_update_points(
+            collection_name=collection_name,
+            update_operations=[
+                SetPayloadOperation(set_payload=SetPayload(payload={"sources": sources}, points=[point_id]))
+                for point_id, sources in updates[i:i + batch_size]
+            ],
+            wait=True
+        )
+    return len(updates)
+
+
+def create_collection(client, collection_name, vector_size, recreate=False, profile=COLLECTION_PROFILE):
+    """Unnamed dense cosine vector plus the ``bm25`` sparse vector, with IDF applied by Qdrant.
+
+    Storage (quantization, HNSW, on-disk vectors/payload) follows ``profile``. An
+    existing collection is left as it is, so a profile change needs a
+    ``recreate`` or ``shadow`` build.
+    """
+    profile = get_profile(profile)
+    config = dict(
+        collection_name=collection_name,
+        vectors_config=profile.vectors_config(vector_size),
+        sparse_vectors_config={SPARSE_VECTOR_NAME: SparseVectorParams(index=profile.sparse_index(), modifier=Modifier.IDF)},
+        hnsw_config=profile.hnsw_config(),
+        quantization_config=profile.quantization_config(),
+        on_disk_payload=profile.on_disk_payload,
+    )
+    if recreate:
+        client.recreate_collection(**config)
+    elif not client.collection_exists(collection_name):
+        client.create_collection(**config)
+    else:
+        return
+    print(f"🗂 Created '{collection_name}' with profile {profile.describe()}")
+
+
+def has_sparse_vectors(client, collection_name):
+    """Whether the collection was created with the ``bm25`` sparse vector (older builds were not)."""
+    sparse = client.get_collection(collection_name).config.params.sparse_vectors or {}
+    return SPARSE_VECTOR_NAME in sparse
+
+
+def collection_mismatch(client, collection_name, vector_size, model=None):
+    """Why ``vector_size``-dim vectors from ``model`` can't be upserted into the existing collection, or None.
+
+    Point ids don't depend on the model, so an incremental build over vectors
+    from another model (or backend) would silently keep the old vectors of
+    every unchanged chunk.
+    """
+    physical = resolve_alias(client, collection_name) or collection_name
+    if not client.collection_exists(physical):
+        return None
+    size = getattr(client.get_collection(physical).config.params.vectors, "size", None)
+    if size != vector_size:
+        return f"'{collection_name}' holds {size}-dim vectors, this build produces {vector_size}-dim ones"
+    if model is not None:
+        meta = read_collection_meta(client, collection_name) or {}
+        if meta.get("model") != model:
+            return f"'{collection_name}' was built with {meta.get('model') or 'an unrecorded model'}, this build uses {model}"
+    return None
+
+
+def resolve_alias(client, alias):
+    """Collection an alias points to, or None if ``alias`` is not an alias."""
+    for a in client.get_aliases().aliases:
+        if a.alias_name == alias:
+            return a.collection_name
+    return None
+
+
+def shadow_collection_name(alias):
+    return f"{alias}__{time.strftime('%Y%m%d%H%M%S')}"
+
+
+def swap_alias(client, alias, new_collection):
+    """Atomically repoint ``alias`` at ``new_collection`` and drop what it pointed to before."""
+    previous = resolve_alias(client, alias)
+    if previous is None and client.collection_exists(alias):
+        # First shadow build over a plain collection: the name must be freed for the alias
+        print(f"⚠️ '{alias}' is a plain collection; replacing it with an alias")
+        client.delete_collection(alias)
+
+    operations = []
+    if previous is not None:
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=new_collection, alias_name=alias)))
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+    if previous is not None and previous != new_collection:
+        client.delete_collection(previous)
+    print(f"🔀 Alias '{alias}' now points to '{new_collection}'")
+
+
+def delete_points(client, collection_name, ids, batch_size=1000):
+    ids = list(ids)
+    for i in range(0, len(ids), batch_size):
+        client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=ids[i:i + batch_size]),
+            wait=True
+        )
+    return len(ids)
+
+
+class ParallelUploader:
+    """Upserts batches on a thread pool with at most ``max_in_flight`` batches pending.
+
+    The bound keeps memory flat when embedding outpaces the server.
+    """
+
+    def __init__(self, client, collection_name, workers=4, max_in_flight=8):
+        self.client = client
+        self.collection_name = collection_name
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self.futures = []
+
+    def submit(self, ids, vectors, payloads, sparse_vectors=None):
+        self.slots.acquire()
+        future = self.pool.submit(self._upload, ids, vectors, payloads, sparse_vectors)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures.append(future)
+        # Surface failures early and keep the futures list short
+        pending = []
+        for f in self.futures:
+            if f.done():
+                f.result()
+            else:
+                pending.append(f)
+        self.futures = pending
+
+    def _upload(self, ids, vectors, payloads, sparse_vectors=None):
+        if sparse_vectors is not None:
+            # Named vectors: "" is the collection's unnamed dense vector. upload_collection's
+            # dict-of-arrays form can't carry sparse vectors, so points go as dicts; one
+            # tolist() over the batch is the same float conversion the client does for NumPy input
+            vectors = [{"": dense, SPARSE_VECTOR_NAME: sparse} for dense, sparse in zip(vectors.tolist(), sparse_vectors)]
+        # A NumPy batch (dense only) is converted by the client in upload-sized slices
+        self.client.upload_collection(
+            collection_name=self.collection_name,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=len(ids),
+            wait=True
+        )
+
+    def close(self):
+        try:
+            for f in self.futures:
+                f.result()
+        finally:
+            self.pool.shutdown(wait=True)
+
+    def abort(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,117 @@
+# src/vectorstore/profiles.py
+"""Collection profiles: how the dense index, vectors and payloads are stored, and how they are searched.
+
+A profile is applied when a collection is created (``recreate`` / ``shadow``
+builds) and read again on the query side for the matching ``SearchParams``,
+so both sides must use the same ``COLLECTION_PROFILE``.
+"""
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    HnswConfigDiff,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SparseIndexParams,
+    VectorParams,
+)
+from src.config import COLLECTION_PROFILE, SEARCH_HNSW_EF
+
+QUANTIZATIONS = (None, "int8", "binary")
+
+
+class CollectionProfile:
+    """Storage and search settings for one collection layout.
+
+    - ``quantization``: None, ``"int8"`` (scalar, 4x smaller) or ``"binary"`` (32x smaller,
+      for high-dimensional embeddings); quantized vectors stay in RAM.
+    - ``oversampling`` / ``rescore``: fetch ``limit * oversampling`` candidates with the
+      quantized vectors, then rescore them with the original ones.
+    - ``m`` / ``ef_construct`` / ``hnsw_ef``: HNSW graph degree, build beam and search beam.
+    - ``on_disk_vectors`` / ``on_disk_payload``: keep original vectors and payloads
+      (the chunk text) memory-mapped instead of in RAM.
+    """
+
+    def __init__(self, name, quantization=None, oversampling=1.0, rescore=True, m=16, ef_construct=100,
+                 hnsw_ef=None, on_disk_vectors=False, on_disk_payload=False):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATIONS}")
+        self.name = name
+        self.quantization = quantization
+        self.oversampling = oversampling
+        self.rescore = rescore
+        self.m = m
+        self.ef_construct = ef_construct
+        self.hnsw_ef = hnsw_ef
+        self.on_disk_vectors = on_disk_vectors
+        self.on_disk_payload = on_disk_payload
+
+    def vectors_config(self, vector_size):
+        return VectorParams(size=vector_size, distance=Distance.COSINE, on_disk=self.on_disk_vectors)
+
+    def sparse_index(self):
+        return SparseIndexParams(on_disk=self.on_disk_vectors)
+
+    def hnsw_config(self):
+        return HnswConfigDiff(m=self.m, ef_construct=self.ef_construct)
+
+    def quantization_config(self):
+        if self.quantization == "int8":
+            return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def search_params(self, hnsw_ef=None):
+        """``SearchParams`` for dense queries, or None when the server defaults apply."""
+        hnsw_ef = hnsw_ef or self.hnsw_ef
+        quantization = None
+        if self.quantization is not None:
+            quantization = QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        if hnsw_ef is None and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+    def describe(self):
+        parts = [f"m={self.m}", f"ef_construct={self.ef_construct}"]
+        if self.hnsw_ef:
+            parts.append(f"hnsw_ef={self.hnsw_ef}")
+        if self.quantization:
+            parts.append(f"{self.quantization} x{self.oversampling:g}{' rescore' if self.rescore else ''}")
+        if self.on_disk_vectors:
+            parts.append("vectors on disk")
+        if self.on_disk_payload:
+            parts.append("payload on disk")
+        return f"{self.name} ({', '.join(parts)})"
+
+
+PROFILES = {
+    # Qdrant defaults: everything in RAM, full-precision vectors
+    "default": CollectionProfile("default"),
+    # int8 vectors in RAM for the HNSW search, originals and chunk text memory-mapped for rescoring
+    "int8": CollectionProfile("int8", quantization="int8", oversampling=2.0, hnsw_ef=128,
+                              on_disk_vectors=True, on_disk_payload=True),
+    # 1 bit per dimension in RAM; needs more oversampling to recover recall
+    "binary": CollectionProfile("binary", quantization="binary", oversampling=3.0, hnsw_ef=128,
+                                on_disk_vectors=True, on_disk_payload=True),
+    # Smallest footprint: sparser HNSW graph on top of the int8 layout
+    "compact": CollectionProfile("compact", quantization="int8", oversampling=3.0, m=8, ef_construct=64,
+                                 hnsw_ef=96, on_disk_vectors=True, on_disk_payload=True),
+}
+
+
+def get_profile(profile=COLLECTION_PROFILE):
+    """Resolve a profile name (or pass a ``CollectionProfile`` through)."""
+    if isinstance(profile, CollectionProfile):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown collection profile '{profile}', expected one of {tuple(PROFILES)}")
+    return PROFILES[profile]
+
+
+def search_params(profile=COLLECTION_PROFILE, hnsw_ef=SEARCH_HNSW_EF):
+    """Query-side ``SearchParams`` for ``profile``; ``hnsw_ef`` (0 = the profile's) overrides the beam."""
+    return get_profile(profile).search_params(hnsw_ef or None)
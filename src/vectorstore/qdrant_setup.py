@@ -1,4 +1,82 @@
-from qdrant_client import QdrantClient
+import uuid
+from src import registry
+from src.config import QDRANT_URL
+from qdrant_client.models import VectorParams, Distance, PointStruct
 
-def get_qdrant_client(host="localhost", port=6333):
-    return QdrantClient(host=host, port=port)
+META_COLLECTION = "rag_meta"
+
+def get_qdrant_client(url=None):
+    """The process-wide client for ``url`` (default ``QDRANT_URL``), created on first use."""
+    return registry.qdrant_client(url or QDRANT_URL)
+
+
+def point_text(payload):
+    """Chunk text stored in a point payload ('text' or 'page_content'), or ''."""
+    payload = payload or {}
+    for key in ("text", "page_content"):
+        value = payload.get(key)
+        if value and value.strip():
+            return value
+    return ""
+
+
+def scroll_points(client, collection_name, batch_size=100, with_payload=True, with_vectors=False):
+    """Yield every point of a collection, one scroll page at a time."""
+    offset = None
+    while True:
+        points, next_offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=with_payload,
+            with_vectors=with_vectors
+        )
+        if not points:
+            break
+        yield from points
+        if next_offset is None:
+            break
+        offset = next_offset
+
+
+# -------- Collection version --------
+# Each build stamps its collection with a version string. It lives in a tiny
+# side collection so it works on any Qdrant server version, and query-side
+# artifacts (BM25 snapshot, caches) compare against it to detect staleness.
+
+def _version_point_id(collection_name):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"rag-collection-version/{collection_name}"))
+
+
+def write_collection_version(client, collection_name, version, model=None, dim=None):
+    if not client.collection_exists(META_COLLECTION):
+        client.create_collection(
+            collection_name=META_COLLECTION,
+            vectors_config=VectorParams(size=1, distance=Distance.COSINE)
+        )
+    client.upsert(
+        collection_name=META_COLLECTION,
+        points=[PointStruct(
+            id=_version_point_id(collection_name),
+            vector=[1.0],
+            payload={"collection": collection_name, "version": version, "model": model, "dim": dim}
+        )]
+    )
+
+
+def read_collection_meta(client, collection_name):
+    """``{"version", "model", "dim"}`` stamped by the last build, or None if the collection was never stamped."""
+    if not client.collection_exists(META_COLLECTION):
+        return None
+    points = client.retrieve(
+        collection_name=META_COLLECTION,
+        ids=[_version_point_id(collection_name)],
+        with_payload=True
+    )
+    return points[0].payload if points else None
+
+
+def read_collection_version(client, collection_name):
+    """Version written by the last build, or None if the collection was never stamped."""
+    meta = read_collection_meta(client, collection_name)
+    return meta.get("version") if meta else None